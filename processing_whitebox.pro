@@ -2,6 +2,11 @@ SOURCES = __init__.py \
           whiteboxProviderPlugin.py \
           whiteboxProvider.py \
           whiteboxAlgorithm.py \
+          whiteboxBatchAlgorithm.py \
+          whiteboxPipelineAlgorithm.py \
+          whiteboxLidarBatchAlgorithm.py \
+          whiteboxProfileSummaryAlgorithm.py \
+          whiteboxMemoryCalibrationAlgorithm.py \
           whiteboxUtils.py
 
 TRANSLATIONS = i18n/processing_whitebox_uk.ts
@@ -27,9 +27,11 @@ __revision__ = '$Format:%H$'
 
 import os
 
+from qgis.PyQt.QtCore import QCoreApplication
 from qgis.PyQt.QtGui import QIcon
-from qgis.core import (QgsProcessing,
-                       QgsProcessingAlgorithm,
+from qgis.core import (QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterDefinition,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterFile,
                        QgsProcessingParameterNumber,
@@ -46,28 +48,60 @@ from processing.core.parameters import getParameterFromString
 from processing.tools.system import isWindows
 
 from processing_whitebox import whiteboxUtils
+from processing_whitebox import whiteboxCache
+from processing_whitebox import whiteboxTiling
+from processing_whitebox import whiteboxStaging
+from processing_whitebox import whiteboxFormats
+from processing_whitebox import whiteboxNative
 
 pluginPath = os.path.dirname(__file__)
 
+# parsed parameter definitions, shared by all instances of the same tool
+_parametersCache = {}
+_icon = None
+
+
+def whiteboxIcon():
+    global _icon
+    if _icon is None:
+        _icon = QIcon(os.path.join(pluginPath, 'icons', 'whiteboxtools.png'))
+    return _icon
+
+
+def parameterPrototypes(description):
+    name = description['name']
+    if name not in _parametersCache:
+        _parametersCache[name] = [getParameterFromString(line) for line in description['parameters']]
+    return _parametersCache[name]
+
+
+def clearParameterPrototypes():
+    # definitions must follow the catalog when it is reloaded
+    _parametersCache.clear()
+
 
 class WhiteboxAlgorithm(QgsProcessingAlgorithm):
 
-    def __init__(self, descriptionFile):
+    TILE_SIZE = 'TILE_SIZE'
+
+    # parameters controlling plugin behaviour, not passed to the tool
+    PLUGIN_PARAMETERS = [TILE_SIZE]
+
+    def __init__(self, description):
         super().__init__()
 
-        self.descriptionFile = descriptionFile
+        self.description = description
         self._name = ''
         self._displayName = ''
         self._group = 'Whitebox Tools'
         self._groupId = 'whiteboxtools'
         self._shortHelp = ''
+        self.overviewFiles = []
 
-        self.params = []
-
-        self.defineCharacteristicsFromFile()
+        self.defineCharacteristics()
 
     def createInstance(self):
-        return self.__class__(self.descriptionFile)
+        return self.__class__(self.description)
 
     def name(self):
         return self._name
@@ -85,13 +119,16 @@ class WhiteboxAlgorithm(QgsProcessingAlgorithm):
         return self._shortHelp
 
     def icon(self):
-        return QIcon(os.path.join(pluginPath, 'icons', 'whiteboxtools.png'))
+        return whiteboxIcon()
 
     def tr(self, text):
         return QCoreApplication.translate("WhiteboxAlgorithm", text)
 
     def initAlgorithm(self, config=None):
-        for p in self.params:
+        # every instance needs its own copies, as algorithm takes ownership
+        # of added parameters
+        for p in parameterPrototypes(self.description):
+            p = p.clone()
             self.addParameter(p, True)
 
             # file destinations are not automatically added as outputs
@@ -101,67 +138,129 @@ class WhiteboxAlgorithm(QgsProcessingAlgorithm):
                 elif p.defaultFileExtension().lower() == 'las':
                     self.addOutput(QgsProcessingOutputFile(p.name(), p.description()))
 
-    def defineCharacteristicsFromFile(self):
-        with open(self.descriptionFile) as lines:
-            line = lines.readline().strip('\n').strip()
-            self._name = line
+        if 'tiling' in self.description:
+            p = QgsProcessingParameterNumber(self.TILE_SIZE,
+                                             self.tr('Process in tiles of this size, in cells (0 = whole raster at once)'),
+                                             QgsProcessingParameterNumber.Integer,
+                                             0,
+                                             False,
+                                             0)
+            p.setFlags(p.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+            self.addParameter(p)
+
+    def defineCharacteristics(self):
+        self._name = self.description['name']
+        self._displayName = self.description['displayName']
+        self._shortHelp = self.description['shortHelp']
 
-            line = lines.readline().strip('\n').strip()
-            self._displayName = line
+    def processAlgorithm(self, parameters, context, feedback):
+        arguments = self.toolArguments(parameters, context, feedback)
+        outputs = self.outputFiles(parameters, context)
+
+        self.overviewFiles = []
+        if whiteboxFormats.backgroundOverviews():
+            # GDAL can not read Whitebox .dep rasters
+            self.overviewFiles = [outputs[name] for name in whiteboxUtils.parameterNames(self.description, 'QgsProcessingParameterRasterDestination')
+                                  if name in outputs and not outputs[name].lower().endswith('.dep')]
+
+        cacheKey = None
+        if whiteboxCache.isEnabled():
+            cacheKey = whiteboxCache.cacheKey(self.name(), arguments, outputs)
+            if whiteboxCache.restore(cacheKey, outputs, feedback):
+                return self.algorithmResults(parameters)
+
+            # outputs may be hard links to cached files, tool should not
+            # write into them
+            whiteboxUtils.removeOutputs(outputs.values())
+
+        tileSize = 0
+        if 'tiling' in self.description:
+            tileSize = self.parameterAsInt(parameters, self.TILE_SIZE, context)
+
+        # simple elementwise tools are computed in-process, without
+        # spawning the executable
+        native = (tileSize == 0 and 'native' in self.description and whiteboxNative.isEnabled()
+                  and whiteboxNative.supports(self.description, arguments, outputs))
+
+        try:
+            if native:
+                whiteboxNative.run(self.description, arguments, outputs, feedback)
+            elif tileSize > 0:
+                whiteboxTiling.runTiled(self.name(), self.description, arguments, outputs, tileSize, feedback)
+            else:
+                whiteboxUtils.execute(self.command(arguments), feedback)
+        except QgsProcessingException:
+            if feedback.isCanceled():
+                whiteboxUtils.removeOutputs(outputs.values())
+            raise
 
-            line = lines.readline().strip('\n').strip()
-            self._shortHelp = line
+        if whiteboxFormats.optimizeOutputs():
+            whiteboxFormats.optimizeGeoTiffs(outputs.values(), feedback)
 
-            line = lines.readline().strip('\n').strip()
-            while line != '':
-                self.params.append(getParameterFromString(line))
-                line = lines.readline().strip('\n').strip()
+        if cacheKey is not None:
+            whiteboxCache.store(cacheKey, outputs, feedback)
 
-    def processAlgorithm(self, parameters, context, feedback):
-        wb = whiteboxUtils.whiteboxToolsExecutable()
-        if wb == '':
-            wb = 'whitebox_tools'
+        return self.algorithmResults(parameters)
+
+    def postProcessAlgorithm(self, context, feedback):
+        # runs in main thread, outputs are loaded while overviews are built
+        if self.overviewFiles:
+            whiteboxFormats.buildOverviewsInBackground(self.overviewFiles)
+            self.overviewFiles = []
+        return {}
+
+    def commandArguments(self, parameters, context, feedback=None):
+        return self.command(self.toolArguments(parameters, context, feedback))
 
-        arguments = [wb]
-        arguments.append('--run={}'.format(self.name()))
+    def command(self, arguments):
+        return whiteboxUtils.toolCommand(self.name(), arguments)
+
+    def toolArguments(self, parameters, context, feedback=None):
+        # raster layers WhiteboxTools can not read are staged to GeoTIFF
+        arguments = []
 
         for param in self.parameterDefinitions():
-            if param.isDestination():
+            if param.isDestination() or param.name() in self.PLUGIN_PARAMETERS:
                 continue
 
             if isinstance(param, QgsProcessingParameterRasterLayer):
                 layer = self.parameterAsRasterLayer(parameters, param.name(), context)
-                arguments.append('--{}="{}"'.format(param.name(), layer.source()))
+                arguments.append((param.name(), whiteboxStaging.layerFile(layer, feedback)))
             elif isinstance(param, QgsProcessingParameterMultipleLayers):
                 layers = self.parameterAsLayerList(parameters, param.name(), context)
                 if layers is None or len(layers) == 0:
                     continue
-                if param.layerType() == QgsProcessing.TypeRaster:
-                    files = [layer.source() for layer in layers]
-                arguments.append('--{}="{}"'.format(param.name(), ','.join(files)))
+                files = [whiteboxStaging.layerFile(layer, feedback) for layer in layers]
+                arguments.append((param.name(), ','.join(files)))
             elif isinstance(param, QgsProcessingParameterBoolean):
-                arguments.append('--{}="{}"'.format(param.name(), self.parameterAsBool(parameters, param.name(), context)))
+                arguments.append((param.name(), self.parameterAsBool(parameters, param.name(), context)))
             elif isinstance(param, QgsProcessingParameterNumber):
-                arguments.append('--{}={}'.format(param.name(), self.parameterAsDouble(parameters, param.name(), context)))
+                arguments.append((param.name(), self.parameterAsDouble(parameters, param.name(), context)))
             elif isinstance(param, QgsProcessingParameterEnum):
-                arguments.append('--{}="{}"'.format(param.name(), self.parameterAsEnum(parameters, param.name(), context)))
+                arguments.append((param.name(), self.parameterAsEnum(parameters, param.name(), context)))
             elif isinstance(param, (QgsProcessingParameterString, QgsProcessingParameterFile)):
-                arguments.append('--{}="{}"'.format(param.name(), self.parameterAsFile(parameters, param.name(), context)))
-            elif isinstance(param, (QgsProcessingParameterString)):
-                arguments.append('--{}="{}"'.format(param.name(), self.parameterAsString(parameters, param.name(), context)))
+                arguments.append((param.name(), self.parameterAsFile(parameters, param.name(), context)))
             else:
-                arguments.append('--{}="{}"'.format(param.name(), self.parameterAsInt(parameters, param.name(), context)))
+                arguments.append((param.name(), self.parameterAsInt(parameters, param.name(), context)))
 
         for out in self.destinationParameterDefinitions():
             if isinstance(out, QgsProcessingParameterRasterDestination):
-                arguments.append('--{}="{}"'.format(out.name(), self.parameterAsOutputLayer(parameters, out.name(), context)))
+                arguments.append((out.name(), self.parameterAsOutputLayer(parameters, out.name(), context)))
             elif isinstance(out, QgsProcessingParameterFileDestination):
-                arguments.append('--{}="{}"'.format(out.name(), self.parameterAsFileOutput(parameters, out.name(), context)))
+                arguments.append((out.name(), self.parameterAsFileOutput(parameters, out.name(), context)))
 
-        arguments.append('-v')
+        return arguments
 
-        whiteboxUtils.execute(arguments, feedback)
+    def outputFiles(self, parameters, context):
+        files = {}
+        for out in self.destinationParameterDefinitions():
+            if isinstance(out, QgsProcessingParameterRasterDestination):
+                files[out.name()] = self.parameterAsOutputLayer(parameters, out.name(), context)
+            elif isinstance(out, QgsProcessingParameterFileDestination):
+                files[out.name()] = self.parameterAsFileOutput(parameters, out.name(), context)
+        return files
 
+    def algorithmResults(self, parameters):
         results = {}
         for output in self.outputDefinitions():
             outputName = output.name()
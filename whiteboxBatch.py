@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxBatch.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from qgis.core import QgsProcessingFeedback
+
+from processing_whitebox import whiteboxUtils
+
+
+class BatchJob:
+    # Single item of a batch. Prepare is called with the job first, then
+    # prerequisite commands run before the main command, finalize is
+    # called with the job once all of them succeeded and temporary files
+    # are removed when job is done, whatever the result.
+    # Job starts only after all jobs it depends on finished successfully.
+    # Signature identifies job parameters in the journal, by default it is
+    # derived from commands
+
+    def __init__(self, label, arguments, outputs=None, prerequisites=None, finalize=None, temporary=None, dependencies=None, signature=None, prepare=None):
+        self.label = label
+        self.arguments = arguments
+        self.outputs = outputs if outputs is not None else []
+        self.prerequisites = prerequisites if prerequisites is not None else []
+        self.finalize = finalize
+        self.prepare = prepare
+        self.temporary = temporary if temporary is not None else []
+        self.dependencies = dependencies if dependencies is not None else []
+        self.signature = signature
+        self.concurrency = None
+        self.attempts = 0
+        self.resumed = False
+        self.progress = 0.0
+        self.error = None
+        self.finished = False
+        self.canceled = False
+
+
+class BatchJobFeedback:
+    # Forwards messages of a single job to the shared feedback object and
+    # reports job progress to the runner. Calls arrive from worker threads,
+    # so access to the shared feedback is serialized.
+
+    def __init__(self, runner, job):
+        self.runner = runner
+        self.job = job
+
+    def isCanceled(self):
+        return self.runner.feedback.isCanceled()
+
+    def setProgress(self, progress):
+        self.runner.jobProgress(self.job, progress)
+
+    def pushInfo(self, info):
+        with self.runner.lock:
+            self.runner.feedback.pushInfo('[{}] {}'.format(self.job.label, info))
+
+    def pushCommandInfo(self, info):
+        with self.runner.lock:
+            self.runner.feedback.pushCommandInfo(info)
+
+    def pushDebugInfo(self, info):
+        with self.runner.lock:
+            self.runner.feedback.pushDebugInfo('[{}] {}'.format(self.job.label, info))
+
+    def pushConsoleInfo(self, info):
+        with self.runner.lock:
+            self.runner.feedback.pushConsoleInfo('[{}] {}'.format(self.job.label, info.rstrip('\n')))
+
+    def reportError(self, error, fatalError=False):
+        with self.runner.lock:
+            self.runner.feedback.reportError('[{}] {}'.format(self.job.label, error))
+
+
+# seconds before the first retry of a failed job, doubled for every next one
+RETRY_DELAY = 5.0
+
+
+class BatchRunner:
+    # Runs WhiteboxTools commands concurrently. Each worker thread drives a
+    # single whitebox_tools process, so at most maxWorkers processes are
+    # alive at any time. With a journal, jobs completed by a previous run
+    # are skipped and every result is recorded. Failed jobs are retried
+    # with exponentially growing delay.
+
+    def __init__(self, feedback=None, maxWorkers=None, journal=None, retries=0, retryDelay=RETRY_DELAY):
+        self.feedback = feedback if feedback is not None else QgsProcessingFeedback()
+        self.maxWorkers = maxWorkers if maxWorkers is not None else whiteboxUtils.maxConcurrency()
+        self.journal = journal
+        self.retries = retries
+        self.retryDelay = retryDelay
+        self.lock = threading.Lock()
+        self.jobs = []
+        self.workers = 1
+        self.totalProgress = 0.0
+
+    def run(self, jobs):
+        self.jobs = list(jobs)
+
+        if self.journal is not None:
+            for job in resumableJobs(self.jobs, self.journal):
+                job.finished = True
+                job.resumed = True
+                job.progress = 100.0
+            resumed = len([j for j in self.jobs if j.resumed])
+            if resumed:
+                self.feedback.pushInfo('Skipping {} jobs completed by previous run'.format(resumed))
+
+        self.totalProgress = sum(j.progress for j in self.jobs)
+        remaining = [j for j in self.jobs if not j.finished]
+        if len(remaining) == 0:
+            return self.jobs
+
+        self.workers = max(1, min(self.maxWorkers, len(remaining)))
+        self.feedback.pushInfo('Running {} jobs using {} concurrent processes'.format(len(remaining), self.workers))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if any(j.dependencies for j in remaining):
+                self.schedule(executor, remaining)
+            else:
+                for job in remaining:
+                    executor.submit(self.runJob, job)
+
+        return self.jobs
+
+    def schedule(self, executor, jobs):
+        # runs jobs as soon as their dependencies are done. Jobs with the
+        # longest chain of dependent jobs go first, so total time gets close
+        # to the critical path
+        depth = chainDepths(self.jobs)
+        pending = sorted(jobs, key=lambda j: depth[id(j)], reverse=True)
+        running = {}
+
+        while pending or running:
+            if not self.feedback.isCanceled():
+                # failure propagates through the whole chain of dependents
+                failed = True
+                while failed:
+                    failed = [j for j in pending if any(d.error is not None or d.canceled for d in j.dependencies)]
+                    for job in failed:
+                        pending.remove(job)
+                        self.notRun(job)
+
+                ready = [j for j in pending if all(d.finished for d in j.dependencies)]
+                ready = ready[:self.workers - len(running)]
+
+                # share cores only between jobs which can actually run now
+                concurrency = len(running) + len(ready)
+                for job in ready:
+                    pending.remove(job)
+                    job.concurrency = concurrency
+                    running[executor.submit(self.runJob, job)] = job
+
+            if not running:
+                break
+
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                running.pop(future)
+
+        # left only when batch was canceled or dependencies can never be met
+        for job in pending:
+            if self.feedback.isCanceled():
+                job.canceled = True
+            else:
+                self.notRun(job)
+
+    def notRun(self, job):
+        job.error = 'Not run, required job failed'
+        if self.journal is not None:
+            self.journal.record(job)
+        self.jobProgress(job, 100)
+
+    def runJob(self, job):
+        if self.feedback.isCanceled():
+            return
+
+        jobFeedback = BatchJobFeedback(self, job)
+        while True:
+            job.attempts += 1
+            try:
+                if job.prepare is not None:
+                    job.prepare(job)
+
+                for arguments in job.prerequisites + [job.arguments]:
+                    whiteboxUtils.execute(arguments, jobFeedback, job.concurrency or self.workers)
+
+                if job.finalize is not None:
+                    job.finalize(job)
+
+                missing = [o for o in job.outputs if not os.path.exists(o)]
+                if missing:
+                    raise RuntimeError('Output was not created: {}'.format(', '.join(missing)))
+            except Exception as e:
+                if not self.feedback.isCanceled() and job.attempts <= self.retries and self.waitRetry(job, e):
+                    continue
+
+                if self.feedback.isCanceled():
+                    job.canceled = True
+                    whiteboxUtils.removeOutputs(job.outputs)
+                else:
+                    job.error = str(e)
+                    with self.lock:
+                        self.feedback.reportError('[{}] {}'.format(job.label, job.error))
+            else:
+                job.finished = True
+            finally:
+                whiteboxUtils.removeOutputs(job.temporary)
+            break
+
+        if self.journal is not None:
+            self.journal.record(job)
+        self.jobProgress(job, 100)
+
+    def waitRetry(self, job, error):
+        # partial outputs are removed and job waits before the next attempt.
+        # Returns False when batch was canceled meanwhile
+        whiteboxUtils.removeOutputs(job.outputs)
+        delay = self.retryDelay * 2 ** (job.attempts - 1)
+        with self.lock:
+            self.feedback.pushInfo('[{}] Attempt {} failed: {}, retrying in {:g} s'.format(job.label, job.attempts, error, delay))
+
+        end = time.monotonic() + delay
+        while time.monotonic() < end:
+            if self.feedback.isCanceled():
+                return False
+            time.sleep(min(0.5, max(0, end - time.monotonic())))
+        return True
+
+    def jobProgress(self, job, progress):
+        with self.lock:
+            self.totalProgress += progress - job.progress
+            job.progress = progress
+            self.feedback.setProgress(self.totalProgress / len(self.jobs))
+
+    def failedJobs(self):
+        return [j for j in self.jobs if j.error is not None]
+
+
+def chainDepths(jobs):
+    # length of the longest chain of jobs depending on every job
+    dependents = {id(j): [] for j in jobs}
+    for job in jobs:
+        for d in job.dependencies:
+            dependents[id(d)].append(job)
+
+    depth = {}
+
+    def visit(job):
+        if id(job) not in depth:
+            depth[id(job)] = 1 + max([visit(d) for d in dependents[id(job)]], default=0)
+        return depth[id(job)]
+
+    for job in jobs:
+        visit(job)
+    return depth
+
+
+def resumableJobs(jobs, journal):
+    # jobs completed by a previous run. Job which depends on a job that has
+    # to run again has to run again too
+    resumable = {}
+
+    def visit(job):
+        if id(job) not in resumable:
+            resumable[id(job)] = journal.isComplete(job) and all(visit(d) for d in job.dependencies)
+        return resumable[id(job)]
+
+    return [j for j in jobs if visit(j)]
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxBatchAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsApplication,
+                       QgsProcessing,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingOutputNumber
+                      )
+
+from processing_whitebox import whiteboxUtils
+from processing_whitebox.whiteboxAlgorithm import whiteboxIcon
+from processing_whitebox.whiteboxBatch import BatchJob, BatchRunner
+from processing_whitebox.whiteboxJournal import BatchJournal, journalPath, commandsSignature, fingerprint
+
+
+def parseOptions(text):
+    options = {}
+    for item in text.split(';'):
+        item = item.strip()
+        if item == '':
+            continue
+        if '=' not in item:
+            raise QgsProcessingException('Invalid tool option "{}", expected name=value'.format(item))
+        name, value = item.split('=', 1)
+        options[name.strip()] = value.strip()
+    return options
+
+
+def openJournal(directory, resume, feedback):
+    # journal of the batch is kept in output directory, so the same batch
+    # can be resumed later
+    fileName = journalPath(directory)
+    if resume and not os.path.exists(fileName):
+        feedback.pushInfo('No journal of previous run found in {}, running all jobs'.format(directory))
+    feedback.pushInfo('Batch journal: {}'.format(fileName))
+    return BatchJournal(fileName, resume)
+
+
+class WhiteboxBatchAlgorithm(QgsProcessingAlgorithm):
+
+    TOOL = 'TOOL'
+    INPUTS = 'INPUTS'
+    INPUT_PARAMETER = 'INPUT_PARAMETER'
+    OPTIONS = 'OPTIONS'
+    OUTPUT_PATTERN = 'OUTPUT_PATTERN'
+    OUTPUT_DIRECTORY = 'OUTPUT_DIRECTORY'
+    RESUME = 'RESUME'
+    RETRIES = 'RETRIES'
+    PROCESSED = 'PROCESSED'
+    FAILED = 'FAILED'
+
+    def __init__(self):
+        super().__init__()
+        self.tools = []
+
+    def createInstance(self):
+        return self.__class__()
+
+    def name(self):
+        return 'batch'
+
+    def displayName(self):
+        return self.tr('Run tool over multiple rasters')
+
+    def group(self):
+        return self.tr('Workflows')
+
+    def groupId(self):
+        return 'workflows'
+
+    def shortHelpString(self):
+        return self.tr('Runs the same WhiteboxTools tool over many input rasters concurrently. '
+                       'Output file names are built from the pattern, where {name} is replaced '
+                       'with the input file name and {tool} with the tool name. Other tool '
+                       'parameters can be given as "name=value" pairs separated by semicolons. '
+                       'Results are recorded in a journal in the output directory, so an '
+                       'interrupted batch can be resumed without running completed rasters again.')
+
+    def icon(self):
+        return whiteboxIcon()
+
+    def tr(self, text):
+        return QCoreApplication.translate('WhiteboxBatchAlgorithm', text)
+
+    def initAlgorithm(self, config=None):
+        # only tools which read a raster and produce a raster can be batched
+        self.tools = [d['name'] for d in whiteboxUtils.loadCatalog()
+                      if whiteboxUtils.parameterNames(d, 'QgsProcessingParameterRasterLayer') and
+                      whiteboxUtils.parameterNames(d, 'QgsProcessingParameterRasterDestination')]
+
+        self.addParameter(QgsProcessingParameterEnum(self.TOOL,
+                                                     self.tr('Tool'),
+                                                     options=self.tools))
+        self.addParameter(QgsProcessingParameterMultipleLayers(self.INPUTS,
+                                                               self.tr('Input rasters'),
+                                                               QgsProcessing.TypeRaster))
+        self.addParameter(QgsProcessingParameterString(self.INPUT_PARAMETER,
+                                                       self.tr('Tool parameter receiving input rasters (default: first raster input)'),
+                                                       optional=True))
+        self.addParameter(QgsProcessingParameterString(self.OPTIONS,
+                                                       self.tr('Other tool parameters'),
+                                                       optional=True))
+        self.addParameter(QgsProcessingParameterString(self.OUTPUT_PATTERN,
+                                                       self.tr('Output file name pattern'),
+                                                       '{name}_{tool}.tif'))
+        self.addParameter(QgsProcessingParameterFolderDestination(self.OUTPUT_DIRECTORY,
+                                                                  self.tr('Output directory')))
+
+        p = QgsProcessingParameterBoolean(self.RESUME,
+                                          self.tr('Resume previous run, skip rasters completed with unchanged outputs'),
+                                          False)
+        p.setFlags(p.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(p)
+        p = QgsProcessingParameterNumber(self.RETRIES,
+                                         self.tr('Number of retries of failed rasters'),
+                                         QgsProcessingParameterNumber.Integer,
+                                         0,
+                                         False,
+                                         0)
+        p.setFlags(p.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(p)
+
+        self.addOutput(QgsProcessingOutputNumber(self.PROCESSED, self.tr('Number of processed rasters')))
+        self.addOutput(QgsProcessingOutputNumber(self.FAILED, self.tr('Number of failed rasters')))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        tool = self.tools[self.parameterAsEnum(parameters, self.TOOL, context)]
+        description = whiteboxUtils.toolDescription(tool)
+        alg = QgsApplication.processingRegistry().createAlgorithmById('whitebox:{}'.format(tool))
+        if alg is None:
+            raise QgsProcessingException(self.tr('Could not find algorithm for tool {}').format(tool))
+
+        inputParameter = self.parameterAsString(parameters, self.INPUT_PARAMETER, context).strip()
+        rasterInputs = whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterLayer')
+        if inputParameter == '':
+            inputParameter = rasterInputs[0]
+        elif inputParameter not in rasterInputs:
+            raise QgsProcessingException(self.tr('Tool {} has no raster input "{}", available inputs are: {}').format(tool, inputParameter, ', '.join(rasterInputs)))
+        outputParameter = whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterDestination')[0]
+
+        options = parseOptions(self.parameterAsString(parameters, self.OPTIONS, context))
+        pattern = self.parameterAsString(parameters, self.OUTPUT_PATTERN, context)
+        directory = self.parameterAsString(parameters, self.OUTPUT_DIRECTORY, context)
+        os.makedirs(directory, exist_ok=True)
+
+        jobs = []
+        outputs = set()
+        for layer in self.parameterAsLayerList(parameters, self.INPUTS, context):
+            source = layer.source()
+            baseName = os.path.splitext(os.path.basename(source))[0]
+            output = os.path.join(directory, pattern.format(name=baseName, tool=tool))
+            if output in outputs:
+                raise QgsProcessingException(self.tr('Output file {} would be written more than once, adjust output file name pattern').format(output))
+            outputs.add(output)
+
+            toolParameters = dict(options)
+            toolParameters[inputParameter] = source
+            toolParameters[outputParameter] = output
+
+            ok, message = alg.checkParameterValues(toolParameters, context)
+            if not ok:
+                raise QgsProcessingException('{}: {}'.format(baseName, message))
+
+            # command arguments contain per-run paths of staged inputs, the
+            # signature is built from what the user gave instead. Rewritten
+            # input invalidates the job too
+            signature = commandsSignature([['', '--run={}'.format(tool)] + ['--{}={}'.format(k, v) for k, v in sorted(toolParameters.items())] +
+                                           ['--input_fingerprint={}'.format(fingerprint(source))]])
+            jobs.append(BatchJob(baseName, alg.commandArguments(toolParameters, context, feedback), [output], signature=signature))
+
+        runner = BatchRunner(feedback, journal=openJournal(directory, self.parameterAsBool(parameters, self.RESUME, context), feedback),
+                             retries=self.parameterAsInt(parameters, self.RETRIES, context))
+        runner.run(jobs)
+
+        failed = runner.failedJobs()
+        processed = len([j for j in jobs if j.finished])
+        if failed:
+            feedback.reportError(self.tr('{} of {} rasters failed: {}').format(len(failed), len(jobs), ', '.join(j.label for j in failed)))
+
+        return {self.OUTPUT_DIRECTORY: directory,
+                self.PROCESSED: processed,
+                self.FAILED: len(failed)}
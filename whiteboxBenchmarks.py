@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxBenchmarks.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+
+import os
+import sys
+import json
+import time
+import platform
+import shutil
+import struct
+import tempfile
+import subprocess
+import argparse
+import resource
+import importlib.util
+import tracemalloc
+
+pluginPath = os.path.dirname(os.path.abspath(__file__))
+
+# largest difference of native output from WhiteboxTools output, relative
+# to the value, accepted by parity check. Both write float32
+NATIVE_TOLERANCE = 1e-5
+
+
+def registerPlugin(path):
+    # import plugin from any checkout, regardless of directory name, so
+    # different revisions can be compared with each other
+    spec = importlib.util.spec_from_file_location('processing_whitebox',
+                                                  os.path.join(path, '__init__.py'),
+                                                  submodule_search_locations=[path])
+    sys.modules['processing_whitebox'] = importlib.util.module_from_spec(spec)
+
+
+def initQgis():
+    from qgis.core import QgsApplication
+
+    app = QgsApplication([], False)
+    app.initQgis()
+
+    sys.path.append(os.path.join(QgsApplication.pkgDataPath(), 'python', 'plugins'))
+    from processing.core.Processing import Processing
+    Processing.initialize()
+
+    return app
+
+
+def residentMemory():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # peak value is the best we can get on non-Linux systems
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def timed(func, repeat):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'max': max(timings), 'mean': sum(timings) / len(timings), 'runs': repeat}
+
+
+def benchmarkProvider(args):
+    from processing_whitebox.whiteboxProvider import WhiteboxProvider
+
+    # first load includes imports and cold caches
+    rssBefore = residentMemory()
+    tracemalloc.start()
+    start = time.perf_counter()
+    provider = WhiteboxProvider()
+    provider.loadAlgorithms()
+    coldTime = time.perf_counter() - start
+    pythonMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rssAfter = residentMemory()
+
+    def load():
+        WhiteboxProvider().loadAlgorithms()
+
+    def instantiate():
+        for alg in provider.algs:
+            alg.createInstance()
+
+    return {'algorithms': len(provider.algs),
+            'coldLoad': coldTime,
+            'load': timed(load, args.repeat),
+            'createInstance': timed(instantiate, args.repeat),
+            'rssDelta': rssAfter - rssBefore,
+            'pythonPeakMemory': pythonMemory}
+
+
+def createRaster(fileName, rows, columns, value=-1.0):
+    # ESRI binary float grid, written without GDAL so benchmarks can run
+    # on machines which only have WhiteboxTools and QGIS installed
+    with open(fileName, 'wb') as f:
+        row = struct.pack('<{}f'.format(columns), *[value] * columns)
+        for i in range(rows):
+            f.write(row)
+
+    with open(os.path.splitext(fileName)[0] + '.hdr', 'w') as f:
+        f.write('ncols {}\nnrows {}\nxllcorner 0.0\nyllcorner 0.0\n'
+                'cellsize 1.0\nNODATA_value -32768.0\nbyteorder LSBFIRST\n'.format(columns, rows))
+
+    return fileName
+
+
+def createSurface(fileName, rows, columns):
+    # tilted plane with regular pits, so hydrological tools have some
+    # work to do
+    with open(fileName, 'wb') as f:
+        for r in range(rows):
+            values = [r * 0.5 + c * 0.25 + ((r * 7 + c * 13) % 5) for c in range(columns)]
+            f.write(struct.pack('<{}f'.format(columns), *values))
+
+    with open(os.path.splitext(fileName)[0] + '.hdr', 'w') as f:
+        f.write('ncols {}\nnrows {}\nxllcorner 0.0\nyllcorner 0.0\n'
+                'cellsize 1.0\nNODATA_value -32768.0\nbyteorder LSBFIRST\n'.format(columns, rows))
+
+    return fileName
+
+
+def createPattern(fileName, rows, columns):
+    # small integers including zeros, with regularly spaced nodata cells,
+    # to check nodata and division by zero handling
+    with open(fileName, 'wb') as f:
+        for r in range(rows):
+            values = [-32768.0 if (r * columns + c) % 11 == 0 else float((r * 3 + c) % 7 - 3) for c in range(columns)]
+            f.write(struct.pack('<{}f'.format(columns), *values))
+
+    with open(os.path.splitext(fileName)[0] + '.hdr', 'w') as f:
+        f.write('ncols {}\nnrows {}\nxllcorner 0.0\nyllcorner 0.0\n'
+                'cellsize 1.0\nNODATA_value -32768.0\nbyteorder LSBFIRST\n'.format(columns, rows))
+
+    return fileName
+
+
+FAKE_TOOL = """import sys
+import time
+lines, delay = int(sys.argv[1]), float(sys.argv[2])
+print('*' * 30)
+print('* Welcome to FakeTool *')
+print('*' * 30)
+for i in range(lines):
+    print('Progress: {}%'.format(i * 100 // lines))
+    if i % 100 == 0:
+        print('Reading data...')
+    if delay:
+        time.sleep(delay)
+print('Elapsed Time (excluding I/O): 0.1s')
+"""
+
+
+def benchmarkSpawn(args):
+    from qgis.core import QgsProcessingFeedback
+    from processing_whitebox import whiteboxUtils
+
+    if args.executable is None:
+        return {'skipped': 'whitebox_tools executable not found'}
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        source = createRaster(os.path.join(directory, 'input.flt'), 10, 10)
+        output = os.path.join(directory, 'output.flt')
+        commands = [args.executable, '--run=AbsoluteValue', '--input={}'.format(source), '--output={}'.format(output), '-v']
+
+        def viaShell():
+            subprocess.run(whiteboxUtils.commandLine(commands), shell=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+        def viaArgv():
+            subprocess.run(commands, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+        def viaExecute():
+            whiteboxUtils.execute(commands, QgsProcessingFeedback())
+
+        return {'tool': 'AbsoluteValue',
+                'rasterSize': [10, 10],
+                'shell': timed(viaShell, args.repeat),
+                'argv': timed(viaArgv, args.repeat),
+                'execute': timed(viaExecute, args.repeat)}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def benchmarkArguments(args):
+    from qgis.core import QgsProcessingContext
+    from processing_whitebox.whiteboxProvider import WhiteboxProvider
+
+    provider = WhiteboxProvider()
+    provider.loadAlgorithms()
+    algorithms = {a.name(): a for a in provider.algs}
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        source = createRaster(os.path.join(directory, 'input.flt'), 10, 10)
+        cases = {'AbsoluteValue': {'input': source,
+                                   'output': os.path.join(directory, 'abs.tif')},
+                 'Slope': {'dem': source,
+                           'output': os.path.join(directory, 'slope.tif'),
+                           'zfactor': 1.0},
+                 'D8FlowAccumulation': {'dem': source,
+                                        'output': os.path.join(directory, 'accum.tif'),
+                                        'out_type': 0,
+                                        'log': False,
+                                        'clip': False}}
+
+        results = {}
+        for name, parameters in cases.items():
+            alg = algorithms[name].createInstance()
+            alg.initAlgorithm()
+            context = QgsProcessingContext()
+
+            def build():
+                alg.commandArguments(parameters, context)
+
+            results[name] = timed(build, args.repeat * 20)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def benchmarkOutput(args):
+    # output parsing and feedback throttling, measured with a fake tool
+    # which prints scripted progress as fast as it can
+    from qgis.core import QgsProcessingFeedback
+    from processing_whitebox import whiteboxUtils
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        script = os.path.join(directory, 'fake_whitebox_tools.py')
+        with open(script, 'w') as f:
+            f.write(FAKE_TOOL)
+
+        results = {}
+        for lines in (1000, 100000):
+            commands = [sys.executable, script, str(lines), '0', '--run=FakeTool', '-v']
+
+            def baseline():
+                subprocess.run(commands, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+            def viaExecute():
+                whiteboxUtils.execute(commands, QgsProcessingFeedback())
+
+            baselineTime = timed(baseline, args.repeat)
+            executeTime = timed(viaExecute, args.repeat)
+            results['{} lines'.format(lines)] = {'baseline': baselineTime,
+                                                 'execute': executeTime,
+                                                 'overhead': executeTime['mean'] - baselineTime['mean'],
+                                                 'linesPerSecond': lines / executeTime['mean']}
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def benchmarkEndToEnd(args):
+    import processing
+    from qgis.core import QgsApplication
+    from processing.core.ProcessingConfig import ProcessingConfig
+    from processing_whitebox import whiteboxUtils
+    from processing_whitebox.whiteboxProvider import WhiteboxProvider
+
+    if args.executable is None:
+        return {'skipped': 'whitebox_tools executable not found'}
+
+    provider = WhiteboxProvider()
+    QgsApplication.processingRegistry().addProvider(provider)
+    ProcessingConfig.setSettingValue(whiteboxUtils.WHITEBOX_ACTIVE, True)
+    ProcessingConfig.setSettingValue(whiteboxUtils.WHITEBOX_EXECUTABLE, args.executable)
+
+    # cheap per-cell tool and a heavier hydrological one
+    cases = {'AbsoluteValue': lambda source, output: {'input': source, 'output': output},
+             'BreachDepressions': lambda source, output: {'dem': source, 'output': output}}
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        results = {}
+        for size in args.sizes:
+            source = createSurface(os.path.join(directory, 'surface_{}.flt'.format(size)), size, size)
+            for name, parameters in cases.items():
+                output = os.path.join(directory, '{}_{}.tif'.format(name, size))
+
+                def run():
+                    processing.run('whitebox:{}'.format(name), parameters(source, output))
+
+                timing = timed(run, args.repeat)
+                timing['cellsPerSecond'] = size * size / timing['mean']
+                results['{} {}x{}'.format(name, size, size)] = timing
+        return results
+    finally:
+        QgsApplication.processingRegistry().removeProvider(provider)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def benchmarkFormats(args):
+    # write throughput: tool converting the same float grid to each format,
+    # read throughput: tool reading it back into a float grid. GeoTIFF is
+    # measured also with compression and overviews post-step
+    from qgis.core import QgsProcessingFeedback
+    from processing_whitebox import whiteboxUtils, whiteboxFormats
+
+    if args.executable is None:
+        return {'skipped': 'whitebox_tools executable not found'}
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        results = {}
+        for size in args.sizes:
+            source = createSurface(os.path.join(directory, 'surface_{}.flt'.format(size)), size, size)
+            for extension in whiteboxFormats.RASTER_FORMATS:
+                written = os.path.join(directory, 'written_{}.{}'.format(size, extension))
+                readBack = os.path.join(directory, 'read_{}.flt'.format(size))
+                toFormat = [args.executable, '--run=AbsoluteValue', '--input={}'.format(source), '--output={}'.format(written), '-v']
+                fromFormat = [args.executable, '--run=AbsoluteValue', '--input={}'.format(written), '--output={}'.format(readBack), '-v']
+
+                def write():
+                    whiteboxUtils.execute(toFormat, QgsProcessingFeedback())
+
+                def read():
+                    whiteboxUtils.execute(fromFormat, QgsProcessingFeedback())
+
+                writeTime = timed(write, args.repeat)
+                readTime = timed(read, args.repeat)
+                result = {'write': writeTime,
+                          'read': readTime,
+                          'writeCellsPerSecond': size * size / writeTime['mean'],
+                          'readCellsPerSecond': size * size / readTime['mean'],
+                          'fileSize': os.path.getsize(written)}
+
+                if extension == 'tif':
+                    start = time.perf_counter()
+                    whiteboxFormats.optimizeGeoTiff(written)
+                    result['optimize'] = time.perf_counter() - start
+                    result['optimizedFileSize'] = os.path.getsize(written)
+                    result['optimizedRead'] = timed(read, args.repeat)
+
+                results['{} {}x{}'.format(extension, size, size)] = result
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def benchmarkNative(args):
+    # in-process engine against WhiteboxTools: timing and parity of values
+    # and nodata masks of outputs
+    import numpy
+    from osgeo import gdal
+    from qgis.core import QgsProcessingFeedback
+    from processing_whitebox import whiteboxUtils, whiteboxNative
+
+    if args.executable is None:
+        return {'skipped': 'whitebox_tools executable not found'}
+
+    cases = {'Add': ['input1', 'input2'],
+             'Divide': ['input1', 'input2'],
+             'GreaterThan': ['input1', 'input2'],
+             'Atan2': ['input_y', 'input_x'],
+             'Sin': ['input'],
+             'Negate': ['input']}
+
+    directory = tempfile.mkdtemp(prefix='wbt_bench_')
+    try:
+        results = {}
+        for size in args.sizes:
+            sources = [createSurface(os.path.join(directory, 'surface_{}.flt'.format(size)), size, size),
+                       createPattern(os.path.join(directory, 'pattern_{}.flt'.format(size)), size, size)]
+            for name, inputs in cases.items():
+                description = whiteboxUtils.toolDescription(name)
+                viaTool = os.path.join(directory, '{}_{}_tool.tif'.format(name, size))
+                viaNative = os.path.join(directory, '{}_{}_native.tif'.format(name, size))
+                arguments = list(zip(inputs, sources))
+                if name == 'GreaterThan':
+                    arguments.append(('incl_equals', True))
+
+                def tool():
+                    whiteboxUtils.execute([args.executable, '--run={}'.format(name)] +
+                                          ['--{}={}'.format(k, v) for k, v in arguments] +
+                                          ['--output={}'.format(viaTool), '-v'], QgsProcessingFeedback())
+
+                def native():
+                    whiteboxNative.run(description, arguments + [('output', viaNative)], {'output': viaNative}, QgsProcessingFeedback())
+
+                toolTime = timed(tool, args.repeat)
+                nativeTime = timed(native, args.repeat)
+
+                expected = gdal.Open(viaTool)
+                actual = gdal.Open(viaNative)
+                a = expected.GetRasterBand(1).ReadAsArray().astype(numpy.float64)
+                b = actual.GetRasterBand(1).ReadAsArray().astype(numpy.float64)
+                maskA = a == expected.GetRasterBand(1).GetNoDataValue()
+                maskB = b == actual.GetRasterBand(1).GetNoDataValue()
+                valid = ~(maskA | maskB)
+                expected = actual = None
+
+                maskMismatches = int(numpy.count_nonzero(maskA != maskB))
+                difference = numpy.abs(a[valid] - b[valid])
+                outOfTolerance = int(numpy.count_nonzero(difference > NATIVE_TOLERANCE * numpy.maximum(1.0, numpy.abs(a[valid]))))
+                results['{} {}x{}'.format(name, size, size)] = {
+                    'tool': toolTime,
+                    'native': nativeTime,
+                    'speedup': toolTime['mean'] / nativeTime['mean'],
+                    'maskMismatches': maskMismatches,
+                    'maxAbsDifference': float(difference.max()) if valid.any() else 0.0,
+                    'outOfTolerance': outOfTolerance,
+                    'passed': maskMismatches == 0 and outOfTolerance == 0}
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def environment(args):
+    from qgis.core import Qgis
+    from processing_whitebox import whiteboxUtils
+
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=args.plugin, universal_newlines=True,
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout.strip()
+    except OSError:
+        revision = ''
+
+    whiteboxVersion = None
+    if args.executable is not None:
+        whiteboxVersion = whiteboxUtils._probeVersion(args.executable)
+
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': revision,
+            'qgis': Qgis.QGIS_VERSION,
+            'whitebox': whiteboxVersion,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+
+benchmarks = {'provider': benchmarkProvider,
+              'spawn': benchmarkSpawn,
+              'arguments': benchmarkArguments,
+              'output': benchmarkOutput,
+              'endtoend': benchmarkEndToEnd,
+              'formats': benchmarkFormats,
+              'native': benchmarkNative}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run Whitebox for Processing benchmarks.')
+    parser.add_argument('benchmarks', metavar='BENCHMARK', nargs='*', help='benchmarks to run: {} (default: all)'.format(', '.join(benchmarks.keys())))
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    parser.add_argument('--output', metavar='FILE', help='write results to JSON file')
+    parser.add_argument('--executable', metavar='FILE', default=shutil.which('whitebox_tools'), help='WhiteboxTools executable')
+    parser.add_argument('--sizes', metavar='N', type=int, nargs='+', default=[100, 2000], help='raster sizes used in end-to-end, formats and native benchmarks')
+    parser.add_argument('--plugin', metavar='DIRECTORY', default=pluginPath, help='plugin checkout to benchmark, e.g. an older revision')
+    args = parser.parse_args()
+
+    names = args.benchmarks or list(benchmarks.keys())
+    for name in names:
+        if name not in benchmarks:
+            parser.error('unknown benchmark: {}'.format(name))
+
+    registerPlugin(os.path.abspath(args.plugin))
+    app = initQgis()
+
+    results = {'environment': environment(args)}
+    for name in names:
+        results[name] = benchmarks[name](args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    # parity checks fail the whole run, so it can gate a change
+    failed = ['{}: {}'.format(name, case) for name in names if isinstance(results[name], dict)
+              for case, result in results[name].items() if isinstance(result, dict) and result.get('passed') is False]
+    if failed:
+        print('Parity check failed for {}'.format(', '.join(failed)), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxCache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools.system import userFolder
+
+from processing_whitebox import whiteboxUtils
+
+WHITEBOX_CACHE = 'WHITEBOX_CACHE'
+WHITEBOX_CACHE_FOLDER = 'WHITEBOX_CACHE_FOLDER'
+WHITEBOX_CACHE_SIZE = 'WHITEBOX_CACHE_SIZE'
+
+ENTRY_FILE = 'entry.json'
+
+_lock = threading.Lock()
+
+
+def isEnabled():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_CACHE))
+
+
+def defaultCacheFolder():
+    return os.path.join(userFolder(), 'whitebox_cache')
+
+
+def cacheFolder():
+    folder = ProcessingConfig.getSetting(WHITEBOX_CACHE_FOLDER)
+    return folder if folder else defaultCacheFolder()
+
+
+def maxCacheSize():
+    try:
+        return float(ProcessingConfig.getSetting(WHITEBOX_CACHE_SIZE)) * 1024 * 1024
+    except (TypeError, ValueError):
+        return 0
+
+
+def relatedFiles(fileName):
+    files = [fileName]
+    root, ext = os.path.splitext(fileName)
+    for sidecar in whiteboxUtils.SIDECAR_EXTENSIONS.get(ext.lower(), []):
+        if os.path.exists(root + sidecar):
+            files.append(root + sidecar)
+    return files
+
+
+def fingerprint(value):
+    # existing files are identified by their size and modification time,
+    # hashing multi-gigabyte rasters would cost more than running most tools
+    fingerprints = []
+    for item in str(value).split(','):
+        if not os.path.isfile(item):
+            return None
+        for fileName in relatedFiles(item):
+            st = os.stat(fileName)
+            fingerprints.append([os.path.abspath(fileName), st.st_size, st.st_mtime_ns])
+    return fingerprints
+
+
+def cacheKey(tool, arguments, outputs):
+    # output files take part only with their extension, as it
+    # defines output format
+    normalized = []
+    for name, value in arguments:
+        if name in outputs:
+            normalized.append([name, os.path.splitext(outputs[name])[1].lower()])
+        else:
+            normalized.append([name, str(value), fingerprint(value)])
+
+    key = json.dumps({'tool': tool,
+                      'version': whiteboxUtils.version(),
+                      'arguments': normalized},
+                     sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def placeFile(source, destination):
+    # existing destination is removed first, so writing to it later can
+    # never modify cached data through a hard link
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def restore(key, outputs, feedback):
+    entryPath = os.path.join(cacheFolder(), key)
+    try:
+        with open(os.path.join(entryPath, ENTRY_FILE)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if set(entry['outputs'].keys()) != set(outputs.keys()):
+        return False
+
+    try:
+        for name, destination in outputs.items():
+            folder = os.path.dirname(destination)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            # first suffix belongs to the output itself, others to its
+            # companion files
+            root = os.path.splitext(destination)[0]
+            for i, suffix in enumerate(entry['outputs'][name]):
+                target = destination if i == 0 else root + suffix
+                placeFile(os.path.join(entryPath, name + suffix), target)
+    except OSError as e:
+        feedback.pushInfo('Could not restore cached result: {}'.format(str(e)))
+        return False
+
+    # entry file modification time is used as last access time for eviction
+    os.utime(os.path.join(entryPath, ENTRY_FILE))
+    feedback.pushInfo('Restored result from cache ({})'.format(key))
+    return True
+
+
+def store(key, outputs, feedback):
+    folder = cacheFolder()
+    entryPath = os.path.join(folder, key)
+    if os.path.exists(entryPath):
+        return
+
+    os.makedirs(folder, exist_ok=True)
+    tmpPath = tempfile.mkdtemp(dir=folder, prefix='.tmp_')
+    try:
+        entry = {'outputs': dict(), 'size': 0}
+        for name, fileName in outputs.items():
+            if not os.path.exists(fileName):
+                return
+
+            root = os.path.splitext(fileName)[0]
+            suffixes = []
+            for f in relatedFiles(fileName):
+                suffix = f[len(root):]
+                shutil.copy2(f, os.path.join(tmpPath, name + suffix))
+                suffixes.append(suffix)
+                entry['size'] += os.path.getsize(f)
+            entry['outputs'][name] = suffixes
+
+        with open(os.path.join(tmpPath, ENTRY_FILE), 'w') as f:
+            json.dump(entry, f)
+
+        # entry becomes visible only when complete
+        os.rename(tmpPath, entryPath)
+    except OSError as e:
+        feedback.pushInfo('Could not store result in cache: {}'.format(str(e)))
+    finally:
+        shutil.rmtree(tmpPath, ignore_errors=True)
+
+    evict(maxCacheSize())
+
+
+def evict(maxSize):
+    folder = cacheFolder()
+    if not os.path.isdir(folder):
+        return
+
+    with _lock:
+        entries = []
+        for key in os.listdir(folder):
+            entryFile = os.path.join(folder, key, ENTRY_FILE)
+            try:
+                with open(entryFile) as f:
+                    size = json.load(f)['size']
+                entries.append((os.path.getmtime(entryFile), size, key))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        # least recently used entries go first
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        for accessed, size, key in entries:
+            if total <= maxSize:
+                break
+            shutil.rmtree(os.path.join(folder, key), ignore_errors=True)
+            total -= size
+
+
+def clear():
+    shutil.rmtree(cacheFolder(), ignore_errors=True)
@@ -29,19 +29,138 @@ __revision__ = '$Format:%H$'
 import re
 import os
 import json
+import hashlib
 import argparse
 import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 nameRegex = re.compile('[A-Z][a-z]*')
 
-
-def whiteboxTools():
+CATALOG_FILE = 'catalog.json'
+
+# hashes of tool parameters descriptions were generated from
+MANIFEST_FILE = 'manifest.json'
+
+# Tools computing every output cell only from input cells within a fixed
+# neighbourhood, so they can be run on overlapping tiles and mosaicked.
+# Tiles overlap by haloCells plus half of the largest value of the
+# haloParameters (filter sizes). Terrain derivatives of geographic
+# rasters convert z units by latitude of the input extent, which differs
+# from tile to tile, so they are tiled only in projected coordinates
+_perCell = {'haloCells': 0, 'haloParameters': []}
+_focal = {'haloCells': 1, 'haloParameters': ['filterx', 'filtery']}
+_kernel3x3 = {'haloCells': 1, 'haloParameters': [], 'projectedOnly': True}
+
+TILE_SAFE_TOOLS = {'AbsoluteValue': _perCell,
+                   'Add': _perCell,
+                   'And': _perCell,
+                   'ArcCos': _perCell,
+                   'ArcSin': _perCell,
+                   'ArcTan': _perCell,
+                   'Atan2': _perCell,
+                   'Ceil': _perCell,
+                   'ConvertNodataToZero': _perCell,
+                   'Cos': _perCell,
+                   'Cosh': _perCell,
+                   'Decrement': _perCell,
+                   'Divide': _perCell,
+                   'EqualTo': _perCell,
+                   'Exp': _perCell,
+                   'Exp2': _perCell,
+                   'Floor': _perCell,
+                   'GreaterThan': _perCell,
+                   'Increment': _perCell,
+                   'IntegerDivision': _perCell,
+                   'IsNoData': _perCell,
+                   'LessThan': _perCell,
+                   'Ln': _perCell,
+                   'Log10': _perCell,
+                   'Log2': _perCell,
+                   'Max': _perCell,
+                   'Min': _perCell,
+                   'Modulo': _perCell,
+                   'Multiply': _perCell,
+                   'Negate': _perCell,
+                   'Not': _perCell,
+                   'NotEqualTo': _perCell,
+                   'Or': _perCell,
+                   'Power': _perCell,
+                   'Reciprocal': _perCell,
+                   'Round': _perCell,
+                   'Sin': _perCell,
+                   'Sinh': _perCell,
+                   'Square': _perCell,
+                   'SquareRoot': _perCell,
+                   'Subtract': _perCell,
+                   'Tan': _perCell,
+                   'Tanh': _perCell,
+                   'ToDegrees': _perCell,
+                   'ToRadians': _perCell,
+                   'Truncate': _perCell,
+                   'Xor': _perCell,
+                   'AdaptiveFilter': _focal,
+                   'ConservativeSmoothingFilter': _focal,
+                   'DevFromMeanElev': _focal,
+                   'DiffFromMeanElev': _focal,
+                   'DiversityFilter': _focal,
+                   'ElevPercentile': _focal,
+                   'HighPassFilter': _focal,
+                   'MajorityFilter': _focal,
+                   'MaximumFilter': _focal,
+                   'MeanFilter': _focal,
+                   'MedianFilter': _focal,
+                   'MinimumFilter': _focal,
+                   'OlympicFilter': _focal,
+                   'PercentElevRange': _focal,
+                   'PercentileFilter': _focal,
+                   'RangeFilter': _focal,
+                   'RelativeTopographicPosition': _focal,
+                   'StandardDeviationFilter': _focal,
+                   'TotalFilter': _focal,
+                   'Aspect': _kernel3x3,
+                   'Hillshade': _kernel3x3,
+                   'PlanCurvature': _kernel3x3,
+                   'ProfileCurvature': _kernel3x3,
+                   'Slope': _kernel3x3,
+                   'TangentialCurvature': _kernel3x3,
+                   'TotalCurvature': _kernel3x3
+                   }
+
+# Peak memory of a run relative to the in-memory size of its raster
+# inputs, for tools needing much more than input and output grids. These
+# are starting values, calibrated from profiling data on every machine
+MEMORY_MULTIPLIERS = {'BreachDepressions': 10.0,
+                      'BreachDepressionsLeastCost': 12.0,
+                      'D8FlowAccumulation': 8.0,
+                      'D8Pointer': 3.0,
+                      'DInfFlowAccumulation': 10.0,
+                      'ElevationAboveStream': 8.0,
+                      'FD8FlowAccumulation': 10.0,
+                      'FillDepressions': 8.0,
+                      'FillDepressionsPlanchonAndDarboux': 8.0,
+                      'FillDepressionsWangAndLiu': 8.0,
+                      'FlowAccumulationFullWorkflow': 16.0,
+                      'Hillslopes': 8.0,
+                      'MaxUpslopeFlowpathLength': 8.0,
+                      'Sink': 8.0,
+                      'StochasticDepressionAnalysis': 12.0,
+                      'Watershed': 6.0
+                      }
+
+# Elementwise tools which can be computed in-process, see whiteboxNative
+NATIVE_TOOLS = ['AbsoluteValue', 'Add', 'And', 'ArcCos', 'ArcSin', 'ArcTan',
+                'Atan2', 'Ceil', 'Cos', 'Cosh', 'Divide', 'EqualTo', 'Exp',
+                'Exp2', 'Floor', 'GreaterThan', 'LessThan', 'Multiply',
+                'Negate', 'NotEqualTo', 'Or', 'Sin', 'Sinh', 'Square',
+                'Subtract', 'Tan', 'Tanh', 'Xor']
+
+
+def whiteboxTools(executable='whitebox_tools', log=print):
     tools = None
 
-    command = ['whitebox_tools --listtools']
+    command = [executable, '--listtools']
     with subprocess.Popen(command,
-                          shell=True,
                           stdout=subprocess.PIPE,
                           stdin=subprocess.DEVNULL,
                           stderr=subprocess.STDOUT,
@@ -58,78 +177,225 @@ def whiteboxTools():
                 toolHelp = t[1].strip()
                 tools[toolName] = toolHelp[:-1]
         except Exception as e:
-            print("Can not get list of the available tools:\n{}".format(str(e)))
+            log("Can not get list of the available tools:\n{}".format(str(e)))
             return None
 
         return tools
 
 
-def createDescriptions(descriptionPath):
-    tools = whiteboxTools()
+def toolParameters(tool, executable='whitebox_tools'):
+    # raw JSON description of tool parameters
+    command = [executable, '--toolparameters={}'.format(tool)]
+    with subprocess.Popen(command,
+                          stdout=subprocess.PIPE,
+                          stdin=subprocess.DEVNULL,
+                          stderr=subprocess.STDOUT,
+                          universal_newlines=True) as proc:
+        return proc.stdout.read()
+
+
+def convertParameters(j, log=print):
+    # problems are reported through log, print when run as a script
+    # collect inputs
+    params = []
+    for p in j['parameters']:
+        parameterType = p['parameter_type']
+        if 'ExistingFileOrFloat' in parameterType or 'ExistingFile' in parameterType:
+            param = _fileParameter(p)
+            if param:
+                params.append(param)
+            else:
+                log(' - failed to process parameter:\n{}'.format(p))
+        elif 'FileList' in parameterType:
+            param = _multifileParameter(p)
+            if param:
+                params.append(param)
+            else:
+                log(' - failed to process parameter:\n{}'.format(p))
+        elif 'OptionList' in parameterType:
+            params.append(_enumParameter(p))
+        elif 'Boolean' in parameterType:
+            params.append(_booleanParameter(p))
+        elif 'Float' in parameterType or 'Integer' in parameterType:
+            params.append(_numberParameter(p))
+        elif 'String' in parameterType:
+            params.append(_stringParameter(p))
+        else:
+            param = _otherParameter(p)
+            if param is not None:
+                log(param)
+
+    # collect outputs
+    for p in j['parameters']:
+        parameterType = p['parameter_type']
+        if 'NewFile' in parameterType:
+            param = _fileOutput(p)
+            if param:
+                params.append(param)
+            else:
+                log(' - failed to process parameter:\n{}'.format(p))
+
+    return params
+
+
+def descriptionText(tool, shortHelp, params):
+    return '{}\n{}\n{}\n{}\n'.format(tool, ' '.join(nameRegex.findall(tool)), shortHelp, '\n'.join(params))
+
+
+def parametersHash(shortHelp, parameters):
+    return hashlib.sha256('{}\n{}'.format(shortHelp, parameters).encode('utf-8')).hexdigest()
+
+
+def readManifest(descriptionPath):
+    try:
+        with open(os.path.join(descriptionPath, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def writeAtomically(fileName, text):
+    # readers never see partially written file, even if generation
+    # is interrupted
+    fd, tmp = tempfile.mkstemp(prefix='.{}'.format(os.path.basename(fileName)), dir=os.path.dirname(fileName) or '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp, fileName)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def createDescriptions(descriptionPath, executable='whitebox_tools', jobs=None, force=False):
+    # tools are queried concurrently, only descriptions of tools which
+    # parameters changed since last run (see manifest) are rewritten
+    tools = whiteboxTools(executable)
+    if tools is None:
+        return
+
+    manifest = {} if force else readManifest(descriptionPath)
+    newManifest = {}
+    changed = []
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {tool: executor.submit(toolParameters, tool, executable) for tool in tools}
 
-    for tool, shortHelp in tools.items():
-        print("\nPROCESS TOOL", tool)
-        params = ""
-        command = ['whitebox_tools --toolparameters="{}"'.format(tool)]
-        with subprocess.Popen(command,
-                              shell=True,
-                              stdout=subprocess.PIPE,
-                              stdin=subprocess.DEVNULL,
-                              stderr=subprocess.STDOUT,
-                              universal_newlines=True) as proc:
+        for tool, shortHelp in tools.items():
             try:
-                for line in proc.stdout:
-                    params += line
-            except Exception as e:
+                parameters = futures[tool].result()
+            except OSError as e:
                 print("Can not get parameters for tool {}:\n{}".format(tool, str(e)))
                 continue
 
-        j = json.loads(params)
-
-        # collect inputs
-        params = []
-        for p in j['parameters']:
-            parameterType = p['parameter_type']
-            if 'ExistingFileOrFloat' in parameterType or 'ExistingFile' in parameterType:
-                param = _fileParameter(p)
-                if param:
-                    params.append(param)
-                else:
-                    print(' - failed to process parameter:\n{}'.format(p))
-            elif 'FileList' in parameterType:
-                param = _multifileParameter(p)
-                if param:
-                    params.append(param)
-                else:
-                    print(' - failed to process parameter:\n{}'.format(p))
-            elif 'OptionList' in parameterType:
-                params.append(_enumParameter(p))
-            elif 'Boolean' in parameterType:
-                params.append(_booleanParameter(p))
-            elif 'Float' in parameterType or 'Integer' in parameterType:
-                params.append(_numberParameter(p))
-            elif 'String' in parameterType:
-                params.append(_stringParameter(p))
-            else:
-                param = _otherParameter(p)
-                if param is not None:
-                    print(param)
-
-        # collect outputs
-        for p in j['parameters']:
-            parameterType = p['parameter_type']
-            if 'NewFile' in parameterType:
-                param = _fileOutput(p)
-                if param:
-                    params.append(param)
-                else:
-                    print(' - failed to process parameter:\n{}'.format(p))
-
-        with open(os.path.join(descriptionPath, '{}.txt'.format(tool)), 'w') as f:
-            f.write('{}\n'.format(tool))
-            f.write('{}\n'.format(' '.join(nameRegex.findall(tool))))
-            f.write('{}\n'.format(shortHelp))
-            f.write('{}\n'.format('\n'.join(params)))
+            digest = parametersHash(shortHelp, parameters)
+            newManifest[tool] = digest
+            descriptionFile = os.path.join(descriptionPath, '{}.txt'.format(tool))
+            if manifest.get(tool) == digest and os.path.exists(descriptionFile):
+                continue
+
+            print("\nPROCESS TOOL", tool)
+            try:
+                params = convertParameters(json.loads(parameters))
+            except (ValueError, KeyError) as e:
+                print("Can not parse parameters of tool {}:\n{}".format(tool, str(e)))
+                del newManifest[tool]
+                continue
+
+            writeAtomically(descriptionFile, descriptionText(tool, shortHelp, params))
+            changed.append(tool)
+
+    # descriptions of tools removed from WhiteboxTools
+    removed = [tool for tool in manifest if tool not in tools]
+    for tool in removed:
+        try:
+            os.remove(os.path.join(descriptionPath, '{}.txt'.format(tool)))
+        except OSError:
+            pass
+
+    print('\n{} tools, {} updated, {} removed'.format(len(newManifest), len(changed), len(removed)))
+    writeAtomically(os.path.join(descriptionPath, MANIFEST_FILE), json.dumps(newManifest, indent=1, sort_keys=True) + '\n')
+    createCatalog(descriptionPath, newManifest.keys())
+
+
+def discoverDescriptions(executable='whitebox_tools', jobs=None, log=print):
+    # descriptions built directly from the installed executable, without
+    # writing description files
+    tools = whiteboxTools(executable, log)
+    if not tools:
+        return None
+
+    descriptions = []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {tool: executor.submit(toolParameters, tool, executable) for tool in tools}
+        for tool in sorted(tools.keys()):
+            try:
+                params = convertParameters(json.loads(futures[tool].result()), log)
+            except (OSError, ValueError, KeyError) as e:
+                log("Can not get parameters for tool {}:\n{}".format(tool, str(e)))
+                continue
+
+            description = {'name': tool,
+                           'displayName': ' '.join(nameRegex.findall(tool)),
+                           'shortHelp': tools[tool],
+                           'parameters': params}
+            addToolProperties(description)
+            descriptions.append(description)
+
+    return descriptions
+
+
+def readDescription(descriptionFile):
+    with open(descriptionFile) as lines:
+        description = dict()
+        description['name'] = lines.readline().strip('\n').strip()
+        description['displayName'] = lines.readline().strip('\n').strip()
+        description['shortHelp'] = lines.readline().strip('\n').strip()
+        description['parameters'] = []
+
+        line = lines.readline().strip('\n').strip()
+        while line != '':
+            description['parameters'].append(line)
+            line = lines.readline().strip('\n').strip()
+
+    addToolProperties(description)
+    return description
+
+
+def addToolProperties(description):
+    # plugin-specific properties, not provided by WhiteboxTools itself
+    name = description['name']
+    if name in TILE_SAFE_TOOLS:
+        description['tiling'] = dict(TILE_SAFE_TOOLS[name])
+    if name in MEMORY_MULTIPLIERS:
+        description['memoryMultiplier'] = MEMORY_MULTIPLIERS[name]
+    if name in NATIVE_TOOLS:
+        description['native'] = True
+
+
+def readDescriptions(descriptionPath, tools=None):
+    # only descriptions of the given tools, or of tools listed in manifest
+    # when folder has one, other text files are not descriptions
+    if tools is None:
+        manifest = readManifest(descriptionPath)
+        if manifest:
+            tools = manifest.keys()
+
+    if tools is not None:
+        files = ['{}.txt'.format(tool) for tool in sorted(tools)]
+    else:
+        files = [f for f in sorted(os.listdir(descriptionPath)) if f.endswith('.txt')]
+
+    descriptions = []
+    for descriptionFile in files:
+        descriptions.append(readDescription(os.path.join(descriptionPath, descriptionFile)))
+
+    return descriptions
+
+
+def createCatalog(descriptionPath, tools=None):
+    catalog = {'algorithms': readDescriptions(descriptionPath, tools)}
+    writeAtomically(os.path.join(descriptionPath, CATALOG_FILE), json.dumps(catalog, indent=1) + '\n')
 
 
 def _fileParameter(param):
@@ -241,7 +507,16 @@ def _fileOutput(param):
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Generate Whitebox Tools descriptions for Processing.')
-    parser.add_argument('directory', metavar='DIRECTORY', nargs='?', default=tempfile.gettempdir(), help='output directory')
+    parser.add_argument('directory', metavar='DIRECTORY', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'descriptions'),
+                        help='descriptions directory (default: plugin descriptions folder)')
+    parser.add_argument('--catalog-only', action='store_true', help='only compile catalog from existing description files')
+    parser.add_argument('--executable', metavar='FILE', default='whitebox_tools', help='WhiteboxTools executable')
+    parser.add_argument('--jobs', metavar='N', type=int, help='number of concurrent queries (default: number of CPU cores)')
+    parser.add_argument('--force', action='store_true', help='regenerate all descriptions, ignoring manifest')
     args = parser.parse_args()
 
-    createDescriptions(args.directory)
+    if args.catalog_only:
+        createCatalog(args.directory)
+    else:
+        createDescriptions(args.directory, args.executable, args.jobs, args.force)
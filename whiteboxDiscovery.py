@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxDiscovery.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import hashlib
+import threading
+
+from qgis.core import QgsMessageLog
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools.system import userFolder
+
+from processing_whitebox import whiteboxDescriptions
+
+WHITEBOX_DISCOVERY = 'WHITEBOX_DISCOVERY'
+
+# known executables, so binary is hashed and its version probed only
+# when it changes on disk
+INDEX_FILE = 'index.json'
+
+_lock = threading.Lock()
+
+
+def isEnabled():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_DISCOVERY))
+
+
+def cacheFolder():
+    return os.path.join(userFolder(), 'whitebox_catalogs')
+
+
+def binaryHash(executable):
+    h = hashlib.sha256()
+    with open(executable, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def readIndex():
+    try:
+        with open(os.path.join(cacheFolder(), INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def binaryIdentity(executable, probeVersion):
+    # version and content hash of the executable
+    executable = os.path.realpath(executable)
+    st = os.stat(executable)
+
+    index = readIndex()
+    entry = index.get(executable)
+    if entry is not None and entry['mtime'] == st.st_mtime and entry['size'] == st.st_size:
+        return entry['version'], entry['hash']
+
+    entry = {'mtime': st.st_mtime,
+             'size': st.st_size,
+             'version': probeVersion(executable) or 'unknown',
+             'hash': binaryHash(executable)}
+    index[executable] = entry
+    os.makedirs(cacheFolder(), exist_ok=True)
+    whiteboxDescriptions.writeAtomically(os.path.join(cacheFolder(), INDEX_FILE), json.dumps(index, indent=1))
+    return entry['version'], entry['hash']
+
+
+def logWarning(message):
+    QgsMessageLog.logMessage(message, 'Processing', QgsMessageLog.WARNING)
+
+
+def loadCatalog(executable, probeVersion):
+    # descriptions of tools provided by the given executable. Discovery
+    # runs once per binary, afterwards they are read from cache
+    with _lock:
+        version, digest = binaryIdentity(executable, probeVersion)
+        fileName = os.path.join(cacheFolder(), 'catalog_{}_{}.json'.format(version, digest[:16]))
+        if os.path.exists(fileName):
+            with open(fileName) as f:
+                return json.load(f)['algorithms']
+
+        descriptions = whiteboxDescriptions.discoverDescriptions(executable, log=logWarning)
+        if not descriptions:
+            return None
+
+        whiteboxDescriptions.writeAtomically(fileName, json.dumps({'algorithms': descriptions}, indent=1) + '\n')
+        return descriptions
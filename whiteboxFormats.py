@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxFormats.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import tempfile
+
+from osgeo import gdal
+
+from qgis.core import QgsApplication, QgsMessageLog, QgsProcessingException, QgsProject, QgsTask
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_whitebox import whiteboxUtils
+
+WHITEBOX_OUTPUT_FORMAT = 'WHITEBOX_OUTPUT_FORMAT'
+WHITEBOX_INTERMEDIATE_FORMAT = 'WHITEBOX_INTERMEDIATE_FORMAT'
+WHITEBOX_OPTIMIZE_OUTPUTS = 'WHITEBOX_OPTIMIZE_OUTPUTS'
+WHITEBOX_BACKGROUND_OVERVIEWS = 'WHITEBOX_BACKGROUND_OVERVIEWS'
+
+# raster formats WhiteboxTools writes
+RASTER_FORMATS = ['tif', 'flt', 'sdat', 'rdc', 'dep']
+
+# raw binary formats, fastest to write and read back by the next tool
+INTERMEDIATE_FORMATS = ['flt', 'dep', 'tif']
+
+# overviews are built until the smallest one fits into this size
+OVERVIEW_MIN_SIZE = 256
+
+
+def outputFormat():
+    return _selection(WHITEBOX_OUTPUT_FORMAT, RASTER_FORMATS)
+
+
+def intermediateFormat():
+    return _selection(WHITEBOX_INTERMEDIATE_FORMAT, INTERMEDIATE_FORMATS)
+
+
+def _selection(name, options):
+    # selection settings are returned as option index
+    value = ProcessingConfig.getSetting(name)
+    if isinstance(value, int) and 0 <= value < len(options):
+        return options[value]
+    if value in options:
+        return value
+    return options[0]
+
+
+def optimizeOutputs():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_OPTIMIZE_OUTPUTS))
+
+
+def backgroundOverviews():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_BACKGROUND_OVERVIEWS))
+
+
+def isGeoTiff(fileName):
+    return os.path.splitext(fileName)[1].lower() in ('.tif', '.tiff')
+
+
+def overviewLevels(xSize, ySize):
+    levels = []
+    level = 2
+    while max(xSize, ySize) // level >= OVERVIEW_MIN_SIZE:
+        levels.append(level)
+        level *= 2
+    return levels
+
+
+def openRaster(fileName):
+    # GDAL exceptions are not enabled, they are global for the whole
+    # application
+    ds = gdal.Open(fileName)
+    if ds is None:
+        raise QgsProcessingException('Could not open {}: {}'.format(fileName, gdal.GetLastErrorMsg()))
+    return ds
+
+
+def optimizeGeoTiff(fileName, feedback=None):
+    # rewrites GeoTIFF written by WhiteboxTools (stripped, uncompressed)
+    # as compressed tiled GeoTIFF with internal overviews, so it can be
+    # displayed quickly in QGIS
+    start = time.monotonic()
+    src = openRaster(fileName)
+    band = src.GetRasterBand(1)
+    isFloat = gdal.GetDataTypeName(band.DataType).startswith(('Float', 'CFloat'))
+    options = ['TILED=YES',
+               'COMPRESS=DEFLATE',
+               'PREDICTOR={}'.format(3 if isFloat else 2),
+               'BIGTIFF=IF_SAFER']
+
+    fd, tmp = tempfile.mkstemp(suffix='.tif', dir=os.path.dirname(fileName) or '.')
+    os.close(fd)
+    try:
+        ds = gdal.Translate(tmp, src, format='GTiff', creationOptions=options)
+        if ds is None:
+            raise RuntimeError('Could not optimize {}: {}'.format(fileName, gdal.GetLastErrorMsg()))
+        levels = overviewLevels(ds.RasterXSize, ds.RasterYSize)
+        if levels and ds.BuildOverviews(overviewResampling(ds.GetRasterBand(1)), levels) != 0:
+            raise RuntimeError('Could not build overviews of {}: {}'.format(fileName, gdal.GetLastErrorMsg()))
+        ds = None
+        src = None
+        os.replace(tmp, fileName)
+    except BaseException:
+        src = None
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    if feedback is not None:
+        feedback.pushInfo('Optimized {} in {:.2f} s'.format(fileName, time.monotonic() - start))
+
+
+def optimizeGeoTiffs(fileNames, feedback=None):
+    for fileName in fileNames:
+        if isGeoTiff(fileName) and os.path.exists(fileName):
+            optimizeGeoTiff(fileName, feedback)
+
+
+def overviewResampling(band):
+    # averaging makes no sense for classes and identifiers
+    isFloat = gdal.GetDataTypeName(band.DataType).startswith(('Float', 'CFloat'))
+    return 'AVERAGE' if isFloat else 'NEAREST'
+
+
+def linkRaster(fileName, link):
+    # hard link, or symbolic one when file system has no hard links, to
+    # the raster and its header sidecars, so GDAL opens the link as the
+    # same raster. Returns False when raster can not be linked
+    root, ext = os.path.splitext(fileName)
+    linkRoot = os.path.splitext(link)[0]
+    pairs = [(fileName, link)]
+    for sidecar in whiteboxUtils.SIDECAR_EXTENSIONS.get(ext.lower(), []):
+        # sidecars named after the whole file (.aux.xml, .ovr) are
+        # written by GDAL, not needed to read the raster
+        if not sidecar.startswith(ext.lower()) and os.path.exists(root + sidecar):
+            pairs.append((root + sidecar, linkRoot + sidecar))
+
+    created = []
+    for source, target in pairs:
+        try:
+            os.link(source, target)
+        except OSError:
+            try:
+                os.symlink(source, target)
+            except OSError:
+                for f in created:
+                    os.remove(f)
+                return False
+        created.append(target)
+    return True
+
+
+def removeLink(link):
+    root, ext = os.path.splitext(link)
+    for f in [link] + [root + s for s in whiteboxUtils.SIDECAR_EXTENSIONS.get(ext.lower(), [])]:
+        if os.path.lexists(f):
+            os.remove(f)
+
+
+def buildOverviews(fileName, canceled=None):
+    # external overviews and statistics are created for a temporary link
+    # to the raster and moved next to it when complete, so QGIS never
+    # opens partially written overviews
+    directory, name = os.path.split(fileName)
+    link = os.path.join(directory, '.building_{}'.format(name))
+    if not linkRaster(fileName, link):
+        link = fileName
+
+    try:
+        ds = openRaster(link)
+        band = ds.GetRasterBand(1)
+        levels = overviewLevels(ds.RasterXSize, ds.RasterYSize)
+        if levels and band.GetOverviewCount() == 0:
+            callback = None
+            if canceled is not None:
+                callback = lambda complete, message, data: 0 if canceled() else 1
+            if ds.BuildOverviews(overviewResampling(band), levels, callback=callback) != 0:
+                raise RuntimeError(gdal.GetLastErrorMsg() or 'canceled')
+
+        # bands without valid cells have no statistics, that is fine
+        for b in range(1, ds.RasterCount + 1):
+            ds.GetRasterBand(b).ComputeStatistics(False)
+        band = None
+        ds = None
+
+        if link != fileName:
+            for suffix in ('.ovr', '.aux.xml'):
+                if os.path.exists(link + suffix):
+                    os.replace(link + suffix, fileName + suffix)
+    finally:
+        if link != fileName:
+            removeLink(link)
+
+
+def reloadLayers(fileNames):
+    # layers opened before overviews were built do not see them
+    fileNames = {os.path.normcase(os.path.abspath(f)) for f in fileNames}
+    for layer in QgsProject.instance().mapLayers().values():
+        if os.path.normcase(os.path.abspath(layer.source())) in fileNames:
+            layer.reload()
+            layer.triggerRepaint()
+
+
+class OverviewsTask(QgsTask):
+
+    def __init__(self, fileNames):
+        super().__init__('Building overviews and statistics of WhiteBox Tools outputs', QgsTask.CanCancel)
+        self.fileNames = fileNames
+        self.processed = []
+        self.errors = []
+
+    def run(self):
+        for i, fileName in enumerate(self.fileNames):
+            if self.isCanceled():
+                return False
+            try:
+                buildOverviews(fileName, self.isCanceled)
+                self.processed.append(fileName)
+            except (OSError, RuntimeError, QgsProcessingException) as e:
+                self.errors.append('{}: {}'.format(fileName, str(e)))
+            self.setProgress(100.0 * (i + 1) / len(self.fileNames))
+        return True
+
+    def finished(self, result):
+        reloadLayers(self.processed)
+        for error in self.errors:
+            QgsMessageLog.logMessage('Could not build overviews of {}'.format(error), 'Processing', QgsMessageLog.WARNING)
+        _tasks.discard(self)
+
+
+# running tasks, task manager does not keep Python objects alive
+_tasks = set()
+
+
+def buildOverviewsInBackground(fileNames):
+    fileNames = [f for f in fileNames if os.path.exists(f)]
+    if len(fileNames) == 0:
+        return None
+
+    task = OverviewsTask(fileNames)
+    _tasks.add(task)
+    QgsApplication.taskManager().addTask(task)
+    return task
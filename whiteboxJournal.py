@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxJournal.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+# journal written next to batch outputs
+JOURNAL_FILE = 'whitebox_batch.jsonl'
+
+
+def journalPath(directory):
+    return os.path.join(directory, JOURNAL_FILE)
+
+
+def jobKey(job):
+    # final outputs identify the job across runs, temporary file names
+    # may change
+    return '|'.join(sorted(job.outputs)) if job.outputs else job.label
+
+
+def commandsSignature(commands):
+    # executable path and per-run arguments like --max_procs do not change
+    # the result
+    h = hashlib.sha1()
+    for command in commands:
+        h.update(json.dumps([str(c) for c in command[1:] if not str(c).startswith('--max_procs=')]).encode('utf-8'))
+    return h.hexdigest()
+
+
+def jobSignature(job):
+    if job.signature is not None:
+        return job.signature
+    return commandsSignature(job.prerequisites + [job.arguments])
+
+
+def fingerprint(fileName):
+    # size and modification time, cheap enough for thousands of tiles and
+    # changed by any rewrite of the file
+    try:
+        st = os.stat(fileName)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class BatchJournal:
+    # Append-only JSONL record of batch jobs. Every finished, failed or
+    # canceled job adds a line, the last line of a job wins. Lines are
+    # synced to disk, so the journal survives a crash of the machine
+
+    def __init__(self, fileName, resume=False):
+        self.fileName = fileName
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        if resume:
+            self.entries = self.read()
+        elif os.path.exists(fileName):
+            os.remove(fileName)
+
+    def read(self):
+        entries = {}
+        try:
+            with open(self.fileName, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry['key']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        # line cut short by a crash
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def isComplete(self, job):
+        # job finished in a previous run with the same commands and its
+        # outputs were not touched since
+        entry = self.entries.get(jobKey(job))
+        if entry is None or entry.get('status') != 'finished' or entry.get('signature') != jobSignature(job):
+            return False
+
+        outputs = entry.get('outputs', {})
+        return all(o in outputs and fingerprint(o) is not None and fingerprint(o) == outputs[o] for o in job.outputs)
+
+    def record(self, job):
+        if job.finished:
+            status = 'finished'
+        elif job.canceled:
+            status = 'canceled'
+        else:
+            status = 'failed'
+
+        entry = {'key': jobKey(job),
+                 'label': job.label,
+                 'status': status,
+                 'signature': jobSignature(job),
+                 'outputs': {o: fingerprint(o) for o in job.outputs} if job.finished else {},
+                 'error': job.error,
+                 'attempts': job.attempts,
+                 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+        with self.lock:
+            self.entries[entry['key']] = entry
+            with open(self.fileName, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxLidar.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import math
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# offsets of LAS public header block fields, see ASPRS LAS specification
+HEADER_VERSION = 24
+HEADER_POINT_OFFSET = 96
+HEADER_POINT_FORMAT = 104
+HEADER_RECORD_LENGTH = 105
+HEADER_NUM_POINTS = 107
+HEADER_SCALE = 131
+HEADER_OFFSET = 155
+HEADER_BOUNDS = 179
+HEADER_NUM_EVLRS = 243
+HEADER_NUM_POINTS_14 = 247
+
+# points processed at once when clipping
+CHUNK_SIZE = 65536
+
+# range of stored point coordinates
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+
+class LasHeader:
+
+    def __init__(self, fileName):
+        with open(fileName, 'rb') as f:
+            data = f.read(375)
+
+        if data[:4] != b'LASF':
+            raise ValueError('{} is not a LAS file'.format(fileName))
+
+        self.version = struct.unpack_from('<BB', data, HEADER_VERSION)
+        self.pointOffset = struct.unpack_from('<I', data, HEADER_POINT_OFFSET)[0]
+        self.pointFormat = struct.unpack_from('<B', data, HEADER_POINT_FORMAT)[0] & 0x3f
+        self.recordLength = struct.unpack_from('<H', data, HEADER_RECORD_LENGTH)[0]
+        self.scale = struct.unpack_from('<3d', data, HEADER_SCALE)
+        self.offset = struct.unpack_from('<3d', data, HEADER_OFFSET)
+        maxX, minX, maxY, minY, maxZ, minZ = struct.unpack_from('<6d', data, HEADER_BOUNDS)
+        self.bounds = (minX, minY, maxX, maxY)
+
+        self.numPoints = struct.unpack_from('<I', data, HEADER_NUM_POINTS)[0]
+        self.numEvlrs = 0
+        if self.version >= (1, 4):
+            self.numPoints = struct.unpack_from('<Q', data, HEADER_NUM_POINTS_14)[0]
+            self.numEvlrs = struct.unpack_from('<I', data, HEADER_NUM_EVLRS)[0]
+
+
+def bufferedBounds(bounds, distance):
+    return (bounds[0] - distance, bounds[1] - distance, bounds[2] + distance, bounds[3] + distance)
+
+
+def intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def neighbours(tiles, distance):
+    # for every tile, list of other tiles intersecting its extent grown by
+    # distance. Relation is symmetric, so with tiles sorted by minimum X
+    # only following tiles up to the end of grown extent are checked
+    names = sorted(tiles.keys(), key=lambda n: tiles[n][0])
+    result = {name: [] for name in names}
+    for i, name in enumerate(names):
+        area = bufferedBounds(tiles[name], distance)
+        for other in names[i + 1:]:
+            if tiles[other][0] > area[2]:
+                break
+            if intersects(area, tiles[other]):
+                result[name].append(other)
+                result[other].append(name)
+    return result
+
+
+def _storedRange(low, high, scale, offset):
+    # inclusive range of stored integer coordinates within low and high,
+    # limited to values a LAS record can hold
+    return (max(INT32_MIN, math.ceil(round((low - offset) / scale, 6))),
+            min(INT32_MAX, math.floor(round((high - offset) / scale, 6))))
+
+
+def clip(source, output, bounds):
+    # copies points within bounds to a new LAS file, streaming them in
+    # chunks, and updates point counts and extent in the header. Chunks
+    # are filtered with NumPy, which releases the GIL, so clipping in
+    # batch worker threads runs in parallel
+    if numpy is None:
+        raise ValueError('Clipping LAS files requires NumPy')
+
+    header = LasHeader(source)
+    if header.numEvlrs > 0:
+        raise ValueError('Clipping LAS files with extended variable length records is not supported')
+
+    returnMask, returnCount = (0x0f, 15) if header.pointFormat >= 6 else (0x07, 5)
+    byReturn = numpy.zeros(returnCount, dtype=numpy.int64)
+    kept = 0
+    minimum = [INT32_MAX] * 3
+    maximum = [INT32_MIN] * 3
+
+    sx, sy, sz = header.scale
+    ox, oy, oz = header.offset
+    size = header.recordLength
+    # stored coordinates and return number of every record, and the whole
+    # records as opaque items which are copied to output
+    fields = numpy.dtype({'names': ['x', 'y', 'z', 'returns'],
+                          'formats': ['<i4', '<i4', '<i4', 'u1'],
+                          'offsets': [0, 4, 8, 14],
+                          'itemsize': size})
+    records = numpy.dtype((numpy.void, size))
+
+    # compare stored integer coordinates, so points which are dropped
+    # do not need to be scaled. Bounds are inclusive, points on the edge of
+    # tile extent taken from its own header have to be kept
+    xMin, xMax = _storedRange(bounds[0], bounds[2], sx, ox)
+    yMin, yMax = _storedRange(bounds[1], bounds[3], sy, oy)
+
+    with open(source, 'rb') as src, open(output, 'wb') as dst:
+        dst.write(src.read(header.pointOffset))
+
+        remaining = header.numPoints
+        while remaining > 0:
+            count = min(CHUNK_SIZE, remaining)
+            chunk = src.read(count * size)
+            remaining -= count
+
+            points = numpy.frombuffer(chunk, dtype=fields, count=len(chunk) // size)
+            mask = (points['x'] >= xMin) & (points['x'] <= xMax) & (points['y'] >= yMin) & (points['y'] <= yMax)
+            selected = points[mask]
+            if len(selected) == 0:
+                continue
+
+            kept += len(selected)
+            if len(selected) == len(points):
+                dst.write(chunk[:len(points) * size])
+            else:
+                dst.write(numpy.frombuffer(chunk, dtype=records, count=len(points))[mask].tobytes())
+            for i, name in enumerate(('x', 'y', 'z')):
+                minimum[i] = min(minimum[i], int(selected[name].min()))
+                maximum[i] = max(maximum[i], int(selected[name].max()))
+            byReturn += numpy.bincount(selected['returns'] & returnMask, minlength=returnCount + 1)[1:returnCount + 1]
+
+        if kept == 0:
+            minX = minY = minZ = maxX = maxY = maxZ = 0.0
+        else:
+            # scale factors are positive, extremes of stored values are
+            # extremes of coordinates
+            minX, minY, minZ = [v * s + o for v, s, o in zip(minimum, header.scale, header.offset)]
+            maxX, maxY, maxZ = [v * s + o for v, s, o in zip(maximum, header.scale, header.offset)]
+
+        byReturn = [int(c) for c in byReturn]
+        legacy = kept if kept <= 0xffffffff and header.pointFormat < 6 else 0
+        dst.seek(HEADER_NUM_POINTS)
+        dst.write(struct.pack('<I', legacy))
+        dst.write(struct.pack('<5I', *(byReturn[:5] if legacy else [0] * 5)))
+        dst.seek(HEADER_BOUNDS)
+        dst.write(struct.pack('<6d', maxX, minX, maxY, minY, maxZ, minZ))
+        if header.version >= (1, 4):
+            dst.seek(HEADER_NUM_POINTS_14)
+            dst.write(struct.pack('<Q', kept))
+            dst.write(struct.pack('<15Q', *(byReturn + [0] * (15 - returnCount))))
+
+    return kept
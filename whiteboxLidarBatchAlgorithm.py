@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxLidarBatchAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import glob
+import shutil
+import tempfile
+
+from osgeo import gdal
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsApplication,
+                       QgsProcessing,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingUtils,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterRasterDestination,
+                       QgsProcessingOutputNumber
+                      )
+
+from processing_whitebox import whiteboxUtils
+from processing_whitebox import whiteboxLidar
+from processing_whitebox.whiteboxAlgorithm import whiteboxIcon
+from processing_whitebox.whiteboxBatch import BatchJob, BatchRunner
+from processing_whitebox.whiteboxJournal import commandsSignature
+from processing_whitebox.whiteboxBatchAlgorithm import parseOptions, openJournal
+
+
+def lidarInputName(description):
+    for line in description['parameters']:
+        tokens = line.split('|')
+        if tokens[0] == 'QgsProcessingParameterFile' and len(tokens) > 4 and tokens[4] == 'las':
+            return tokens[1]
+    return None
+
+
+class WhiteboxLidarBatchAlgorithm(QgsProcessingAlgorithm):
+
+    TOOL = 'TOOL'
+    INPUT_FOLDER = 'INPUT_FOLDER'
+    INPUTS = 'INPUTS'
+    OPTIONS = 'OPTIONS'
+    BUFFER = 'BUFFER'
+    OUTPUT_DIRECTORY = 'OUTPUT_DIRECTORY'
+    RESUME = 'RESUME'
+    RETRIES = 'RETRIES'
+    MOSAIC = 'MOSAIC'
+    PROCESSED = 'PROCESSED'
+    FAILED = 'FAILED'
+
+    def __init__(self):
+        super().__init__()
+        self.tools = []
+
+    def createInstance(self):
+        return self.__class__()
+
+    def name(self):
+        return 'lidarbatch'
+
+    def displayName(self):
+        return self.tr('Run LiDAR tool over tiles')
+
+    def group(self):
+        return self.tr('Workflows')
+
+    def groupId(self):
+        return 'workflows'
+
+    def shortHelpString(self):
+        return self.tr('Runs the same WhiteboxTools LiDAR tool over many LAS tiles, e.g. created '
+                       'by the LidarTile tool, concurrently. Tiles closer than the buffer distance '
+                       'are joined to every tile before processing, so results do not show edge '
+                       'artifacts, and the result is clipped back to the tile extent. Raster '
+                       'results can be mosaicked into a single raster. Other tool parameters can '
+                       'be given as "name=value" pairs separated by semicolons. Results are recorded '
+                       'in a journal in the output directory, so an interrupted run can be resumed '
+                       'without processing completed tiles again.')
+
+    def icon(self):
+        return whiteboxIcon()
+
+    def tr(self, text):
+        return QCoreApplication.translate('WhiteboxLidarBatchAlgorithm', text)
+
+    def initAlgorithm(self, config=None):
+        # only tools which read a single LAS file and write a single raster
+        # or LAS file can be run over tiles
+        self.tools = [d['name'] for d in whiteboxUtils.loadCatalog()
+                      if lidarInputName(d) is not None and len(whiteboxUtils.destinationNames(d)) == 1]
+
+        self.addParameter(QgsProcessingParameterEnum(self.TOOL,
+                                                     self.tr('Tool'),
+                                                     options=self.tools))
+        self.addParameter(QgsProcessingParameterFile(self.INPUT_FOLDER,
+                                                     self.tr('Folder with LAS tiles'),
+                                                     behavior=QgsProcessingParameterFile.Folder,
+                                                     optional=True))
+        self.addParameter(QgsProcessingParameterMultipleLayers(self.INPUTS,
+                                                               self.tr('LAS tiles'),
+                                                               QgsProcessing.TypeFile,
+                                                               optional=True))
+        self.addParameter(QgsProcessingParameterString(self.OPTIONS,
+                                                       self.tr('Other tool parameters'),
+                                                       optional=True))
+        self.addParameter(QgsProcessingParameterNumber(self.BUFFER,
+                                                       self.tr('Buffer distance'),
+                                                       QgsProcessingParameterNumber.Double,
+                                                       10.0,
+                                                       minValue=0.0))
+        self.addParameter(QgsProcessingParameterFolderDestination(self.OUTPUT_DIRECTORY,
+                                                                  self.tr('Output directory')))
+        self.addParameter(QgsProcessingParameterRasterDestination(self.MOSAIC,
+                                                                  self.tr('Mosaic'),
+                                                                  optional=True,
+                                                                  createByDefault=False))
+
+        p = QgsProcessingParameterBoolean(self.RESUME,
+                                          self.tr('Resume previous run, skip tiles completed with unchanged outputs'),
+                                          False)
+        p.setFlags(p.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(p)
+        p = QgsProcessingParameterNumber(self.RETRIES,
+                                         self.tr('Number of retries of failed tiles'),
+                                         QgsProcessingParameterNumber.Integer,
+                                         0,
+                                         False,
+                                         0)
+        p.setFlags(p.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(p)
+
+        self.addOutput(QgsProcessingOutputNumber(self.PROCESSED, self.tr('Number of processed tiles')))
+        self.addOutput(QgsProcessingOutputNumber(self.FAILED, self.tr('Number of failed tiles')))
+
+    def tileFiles(self, parameters, context):
+        files = []
+        folder = self.parameterAsString(parameters, self.INPUT_FOLDER, context)
+        if folder:
+            files.extend(sorted(glob.glob(os.path.join(folder, '*.las')) + glob.glob(os.path.join(folder, '*.LAS'))))
+        files.extend(self.parameterAsFileList(parameters, self.INPUTS, context))
+
+        # same tile given both ways should be processed only once
+        return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        tool = self.tools[self.parameterAsEnum(parameters, self.TOOL, context)]
+        description = whiteboxUtils.toolDescription(tool)
+        alg = QgsApplication.processingRegistry().createAlgorithmById('whitebox:{}'.format(tool))
+        if alg is None:
+            raise QgsProcessingException(self.tr('Could not find algorithm for tool {}').format(tool))
+
+        inputParameter = lidarInputName(description)
+        outputParameter = whiteboxUtils.destinationNames(description)[0]
+        rasterOutput = outputParameter in whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterDestination')
+        extension = 'tif' if rasterOutput else 'las'
+
+        mosaicFile = self.parameterAsOutputLayer(parameters, self.MOSAIC, context)
+        if mosaicFile and not rasterOutput:
+            raise QgsProcessingException(self.tr('Tool {} does not create rasters, they can not be mosaicked').format(tool))
+        if mosaicFile and os.path.splitext(mosaicFile)[1].lower() not in ('.tif', '.tiff'):
+            raise QgsProcessingException(self.tr('Mosaic is written as GeoTIFF only'))
+
+        files = self.tileFiles(parameters, context)
+        if len(files) == 0:
+            raise QgsProcessingException(self.tr('No LAS tiles found'))
+
+        tiles = {}
+        for fileName in files:
+            try:
+                tiles[fileName] = whiteboxLidar.LasHeader(fileName).bounds
+            except (OSError, ValueError) as e:
+                raise QgsProcessingException(self.tr('Could not read {}: {}').format(fileName, e))
+
+        distance = self.parameterAsDouble(parameters, self.BUFFER, context)
+        neighbours = whiteboxLidar.neighbours(tiles, distance) if distance > 0 else {f: [] for f in files}
+        feedback.pushInfo(self.tr('{} tiles, on average {:.1f} neighbours within buffer').format(len(files), sum(len(n) for n in neighbours.values()) / len(files)))
+
+        options = parseOptions(self.parameterAsString(parameters, self.OPTIONS, context))
+        directory = self.parameterAsString(parameters, self.OUTPUT_DIRECTORY, context)
+        os.makedirs(directory, exist_ok=True)
+
+        folder = tempfile.mkdtemp(prefix='whitebox_lidar_', dir=QgsProcessingUtils.tempFolder())
+        try:
+            jobs = []
+            for fileName in files:
+                baseName = os.path.splitext(os.path.basename(fileName))[0]
+                output = os.path.join(directory, '{}_{}.{}'.format(baseName, tool, extension))
+                toolOutput = os.path.join(folder, '{}_{}.{}'.format(baseName, tool, extension))
+
+                prerequisites = []
+                temporary = [toolOutput]
+                prepare = None
+                source = fileName
+                if neighbours[fileName]:
+                    # only points of neighbours within buffer are joined
+                    clipped = [os.path.join(folder, '{}_near_{}.las'.format(baseName, os.path.splitext(os.path.basename(n))[0]))
+                               for n in neighbours[fileName]]
+                    prepare = self.neighboursClipper(neighbours[fileName], clipped, whiteboxLidar.bufferedBounds(tiles[fileName], distance))
+
+                    source = os.path.join(folder, '{}_joined.las'.format(baseName))
+                    prerequisites.append(whiteboxUtils.toolCommand('LidarJoin', [('inputs', ','.join([fileName] + clipped)),
+                                                                                 ('output', source)]))
+                    temporary.extend(clipped + [source])
+
+                toolParameters = dict(options)
+                toolParameters[inputParameter] = source
+                toolParameters[outputParameter] = toolOutput
+
+                arguments = alg.commandArguments(toolParameters, context)
+
+                # temporary folder differs between runs, it should not
+                # prevent resuming
+                signature = commandsSignature([[str(c).replace(folder, '') for c in command] for command in prerequisites + [arguments]] +
+                                              [['', '--buffer={}'.format(distance)]])
+
+                job = BatchJob(baseName,
+                               arguments,
+                               [output],
+                               prerequisites,
+                               self.clipper(toolOutput, output, tiles[fileName], rasterOutput),
+                               temporary,
+                               signature=signature,
+                               prepare=prepare)
+                jobs.append(job)
+
+            runner = BatchRunner(feedback, journal=openJournal(directory, self.parameterAsBool(parameters, self.RESUME, context), feedback),
+                                 retries=self.parameterAsInt(parameters, self.RETRIES, context))
+            runner.run(jobs)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+        failed = runner.failedJobs()
+        finished = [j for j in jobs if j.finished]
+        if failed:
+            feedback.reportError(self.tr('{} of {} tiles failed: {}').format(len(failed), len(jobs), ', '.join(j.label for j in failed)))
+
+        results = {self.OUTPUT_DIRECTORY: directory,
+                   self.PROCESSED: len(finished),
+                   self.FAILED: len(failed)}
+
+        if mosaicFile and finished and not feedback.isCanceled():
+            feedback.pushInfo(self.tr('Mosaicking {} tiles').format(len(finished)))
+            self.mosaic(mosaicFile, [j.outputs[0] for j in finished])
+            results[self.MOSAIC] = mosaicFile
+
+        return results
+
+    def neighboursClipper(self, sources, outputs, bounds):
+        def clip(job):
+            for source, output in zip(sources, outputs):
+                try:
+                    whiteboxLidar.clip(source, output, bounds)
+                except ValueError:
+                    # LAS 1.4 files with extended records, or any file when
+                    # NumPy is missing, are joined whole
+                    shutil.copyfile(source, output)
+        return clip
+
+    def clipper(self, source, output, bounds, raster):
+        # result is computed on the tile joined with its neighbours, only
+        # the part within tile extent is kept
+        def clip(job):
+            if raster:
+                minX, minY, maxX, maxY = bounds
+                if gdal.Translate(output, source, projWin=[minX, maxY, maxX, minY],
+                                  creationOptions=['TILED=YES', 'COMPRESS=LZW', 'BIGTIFF=IF_SAFER']) is None:
+                    raise RuntimeError('Could not clip {}: {}'.format(source, gdal.GetLastErrorMsg()))
+            else:
+                whiteboxLidar.clip(source, output, bounds)
+        return clip
+
+    def mosaic(self, output, tileFiles):
+        vrt = os.path.join(QgsProcessingUtils.tempFolder(), '{}.vrt'.format(os.path.splitext(os.path.basename(output))[0]))
+        if gdal.BuildVRT(vrt, tileFiles) is None:
+            raise QgsProcessingException(self.tr('Could not build mosaic: {}').format(gdal.GetLastErrorMsg()))
+        ok = gdal.Translate(output, vrt, creationOptions=['TILED=YES', 'COMPRESS=LZW', 'BIGTIFF=IF_SAFER']) is not None
+        os.remove(vrt)
+        if not ok:
+            raise QgsProcessingException(self.tr('Could not write mosaic {}: {}').format(output, gdal.GetLastErrorMsg()))
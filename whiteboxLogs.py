@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxLogs.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import itertools
+import threading
+import collections
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools.system import userFolder
+
+WHITEBOX_LOG_FOLDER = 'WHITEBOX_LOG_FOLDER'
+WHITEBOX_LOG_FILES = 'WHITEBOX_LOG_FILES'
+
+# lines of tool output kept in memory and passed to the message log
+TAIL_LINES = 200
+
+_counter = itertools.count()
+_pruneLock = threading.Lock()
+
+
+def defaultLogFolder():
+    return os.path.join(userFolder(), 'whitebox_logs')
+
+
+def logFolder():
+    folder = ProcessingConfig.getSetting(WHITEBOX_LOG_FOLDER)
+    return folder if folder else defaultLogFolder()
+
+
+def maxLogFiles():
+    try:
+        return max(0, int(ProcessingConfig.getSetting(WHITEBOX_LOG_FILES)))
+    except (TypeError, ValueError):
+        return 100
+
+
+def newLogFile(tool):
+    # unique name, concurrent runs of the same tool start in the same second
+    name = '{}_{}_{}_{}.log'.format(time.strftime('%Y%m%d-%H%M%S'), tool or 'whitebox', os.getpid(), next(_counter))
+    return os.path.join(logFolder(), name)
+
+
+def prune(folder):
+    # only the newest log files are kept
+    limit = maxLogFiles()
+    with _pruneLock:
+        try:
+            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.log')]
+        except OSError:
+            return
+
+        files.sort(key=lambda f: os.path.getmtime(f) if os.path.exists(f) else 0)
+        for f in files[:max(0, len(files) - limit)]:
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+
+
+class RunLog:
+    # Output of a single run. Only the last lines are kept in memory, the
+    # whole output is streamed to a log file as it arrives, so memory stays
+    # flat however long the run is
+
+    def __init__(self, fileName=None, header=None, tailLines=TAIL_LINES):
+        self.tail = collections.deque(maxlen=tailLines)
+        self.count = 0
+        self.fileName = None
+        self.file = None
+
+        if fileName is not None and maxLogFiles() > 0:
+            try:
+                os.makedirs(os.path.dirname(fileName), exist_ok=True)
+                self.file = open(fileName, 'w', encoding='utf-8', errors='replace')
+                self.fileName = fileName
+                if header:
+                    self.file.write(header + '\n\n')
+            except OSError:
+                self.file = None
+
+    def write(self, lines):
+        self.tail.extend(lines)
+        self.count += len(lines)
+        if self.file is not None:
+            try:
+                self.file.write('\n'.join(lines))
+                self.file.write('\n')
+            except OSError:
+                self.close()
+
+    def close(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+            prune(os.path.dirname(self.fileName))
+
+    def text(self, lines=None):
+        # tail of the output, with a note where to find the rest
+        tail = list(self.tail)[-lines:] if lines else list(self.tail)
+        omitted = self.count - len(tail)
+        header = []
+        if omitted > 0:
+            header.append('[{} earlier lines omitted]'.format(omitted))
+        if self.fileName is not None:
+            header.append('[full output in {}]'.format(self.fileName))
+        return '\n'.join(header + tail)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxMemory.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import json
+import threading
+import collections
+
+from osgeo import gdal
+
+from qgis.core import QgsProcessingException
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools.system import userFolder
+
+WHITEBOX_MEMORY_ADMISSION = 'WHITEBOX_MEMORY_ADMISSION'
+WHITEBOX_MEMORY_LIMIT = 'WHITEBOX_MEMORY_LIMIT'
+
+# memory used by the executable itself, whatever the data
+BASE_MEMORY = 64 * 1024 * 1024
+
+# tools without known multiplier hold input and output grids plus a bit
+DEFAULT_MULTIPLIER = 3.0
+
+# calibrated multiplier is the largest observed one with this headroom
+CALIBRATION_MARGIN = 1.1
+
+# share of physical memory available to runs when limit is not set
+MEMORY_FRACTION = 0.8
+
+# seconds between checks for cancellation while run waits for memory
+WAIT_INTERVAL = 0.5
+
+# bytes per cell of Whitebox .dep rasters by data type
+DEP_DATA_TYPES = {'double': 8, 'float': 4, 'i64': 8, 'i32': 4, 'integer': 2, 'i16': 2, 'byte': 1}
+
+_calibration = None
+_calibrationLock = threading.Lock()
+
+
+def isEnabled():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_MEMORY_ADMISSION))
+
+
+def physicalMemory():
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def memoryBudget():
+    try:
+        limit = float(ProcessingConfig.getSetting(WHITEBOX_MEMORY_LIMIT)) * 1024 * 1024
+    except (TypeError, ValueError):
+        limit = 0
+    return limit if limit > 0 else physicalMemory() * MEMORY_FRACTION
+
+
+def calibrationPath():
+    return os.path.join(userFolder(), 'whitebox_memory.json')
+
+
+def calibratedMultipliers():
+    global _calibration
+    with _calibrationLock:
+        if _calibration is None:
+            try:
+                with open(calibrationPath()) as f:
+                    _calibration = json.load(f)
+            except (OSError, ValueError):
+                _calibration = {}
+        return _calibration
+
+
+def saveCalibration(multipliers):
+    global _calibration
+    with _calibrationLock:
+        with open(calibrationPath(), 'w') as f:
+            json.dump(multipliers, f, indent=1, sort_keys=True)
+        _calibration = dict(multipliers)
+
+
+def multiplier(tool, description):
+    calibrated = calibratedMultipliers()
+    if tool in calibrated:
+        return calibrated[tool]
+    if description is not None:
+        return description.get('memoryMultiplier', DEFAULT_MULTIPLIER)
+    return DEFAULT_MULTIPLIER
+
+
+def depRasterBytes(fileName):
+    rows = columns = 0
+    cellSize = 8
+    with open(fileName) as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            key = key.strip().lower()
+            if key == 'rows':
+                rows = int(value)
+            elif key == 'cols' or key == 'columns':
+                columns = int(value)
+            elif key == 'data type':
+                cellSize = DEP_DATA_TYPES.get(value.strip().lower(), 8)
+    return rows * columns * cellSize
+
+
+def rasterBytes(fileName):
+    # size of raster data in memory, from header only. Files which are
+    # not rasters count with their size
+    try:
+        if fileName.lower().endswith('.dep'):
+            return depRasterBytes(fileName)
+
+        ds = gdal.Open(fileName)
+        if ds is None:
+            return os.path.getsize(fileName)
+
+        size = 0
+        for b in range(1, ds.RasterCount + 1):
+            dataType = ds.GetRasterBand(b).DataType
+            size += ds.RasterXSize * ds.RasterYSize * gdal.GetDataTypeSize(dataType) // 8
+        ds = None
+        return size
+    except (RuntimeError, OSError, ValueError):
+        try:
+            return os.path.getsize(fileName)
+        except OSError:
+            return 0
+
+
+def estimate(tool, description, inputFiles):
+    # predicted peak memory of the run and size of its inputs it is
+    # derived from
+    inputBytes = sum(rasterBytes(f) for f in inputFiles)
+    return BASE_MEMORY + multiplier(tool, description) * inputBytes, inputBytes
+
+
+def calibrate(records):
+    # multipliers from peak memory of finished runs recorded by profiling
+    ratios = {}
+    for r in records:
+        if r.get('status') != 'finished' or not r.get('peakMemory') or not r.get('rasterBytes'):
+            continue
+        ratio = max(0, r['peakMemory'] - BASE_MEMORY) / r['rasterBytes']
+        ratios[r['tool']] = max(ratios.get(r['tool'], 0), ratio)
+
+    return {tool: round(ratio * CALIBRATION_MARGIN, 2) for tool, ratio in ratios.items() if ratio > 0}
+
+
+class MemoryGovernor:
+    # Admits runs while sum of their estimated peak memory fits into the
+    # budget. Run which does not fit waits until others finish; when
+    # nothing else is running it is admitted anyway, there is nothing to
+    # wait for. Runs are admitted in order of arrival, small runs do not
+    # overtake a large one waiting for memory, so it can not starve.
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.runs = dict()
+        self.nextId = 0
+        self.queue = collections.deque()
+        self.nextTicket = 0
+
+    def acquire(self, estimated, feedback=None):
+        with self.condition:
+            self.nextTicket += 1
+            ticket = self.nextTicket
+            self.queue.append(ticket)
+            try:
+                waiting = False
+                while self.queue[0] != ticket or (self.runs and sum(self.runs.values()) + estimated > memoryBudget()):
+                    if feedback is not None:
+                        if feedback.isCanceled():
+                            raise QgsProcessingException('WhiteBox Tools process was canceled')
+                        if not waiting:
+                            feedback.pushInfo('Waiting for memory, run needs about {} MB'.format(int(estimated / 1024 / 1024)))
+                    waiting = True
+                    self.condition.wait(WAIT_INTERVAL)
+            finally:
+                # canceled waiter leaves the queue too, runs behind it
+                # may be admitted now
+                self.queue.remove(ticket)
+                self.condition.notify_all()
+
+            self.nextId += 1
+            self.runs[self.nextId] = estimated
+            return self.nextId
+
+    def release(self, runId):
+        with self.condition:
+            self.runs.pop(runId, None)
+            self.condition.notify_all()
+
+    def allocation(self):
+        with self.condition:
+            return {'budget': memoryBudget(),
+                    'runs': list(self.runs.values())}
+
+
+memoryGovernor = MemoryGovernor()
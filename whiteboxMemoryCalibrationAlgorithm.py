@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxMemoryCalibrationAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingOutputNumber
+                      )
+
+from processing_whitebox.whiteboxAlgorithm import whiteboxIcon
+from processing_whitebox import whiteboxUtils
+from processing_whitebox import whiteboxMemory
+from processing_whitebox import whiteboxProfiling
+
+
+class WhiteboxMemoryCalibrationAlgorithm(QgsProcessingAlgorithm):
+
+    KEEP_EXISTING = 'KEEP_EXISTING'
+    CALIBRATED = 'CALIBRATED'
+
+    def createInstance(self):
+        return self.__class__()
+
+    def name(self):
+        return 'calibratememory'
+
+    def displayName(self):
+        return self.tr('Calibrate memory estimates')
+
+    def group(self):
+        return self.tr('Workflows')
+
+    def groupId(self):
+        return 'workflows'
+
+    def shortHelpString(self):
+        return self.tr('Updates per-tool memory multipliers used to queue runs until they fit '
+                       'into available memory. Multipliers are computed from peak memory of '
+                       'runs recorded in the profiling log, so profiling should be enabled '
+                       'for a while before calibration.')
+
+    def icon(self):
+        return whiteboxIcon()
+
+    def tr(self, text):
+        return QCoreApplication.translate('WhiteboxMemoryCalibrationAlgorithm', text)
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterBoolean(self.KEEP_EXISTING,
+                                                        self.tr('Keep calibration of tools missing in profiling log'),
+                                                        True))
+
+        self.addOutput(QgsProcessingOutputNumber(self.CALIBRATED, self.tr('Number of calibrated tools')))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        multipliers = whiteboxMemory.calibrate(whiteboxProfiling.readRecords())
+        if len(multipliers) == 0:
+            raise QgsProcessingException(self.tr('Profiling log {} has no runs with recorded peak memory, enable profiling in provider settings first').format(whiteboxProfiling.logPath()))
+
+        calibration = {}
+        if self.parameterAsBool(parameters, self.KEEP_EXISTING, context):
+            calibration.update(whiteboxMemory.calibratedMultipliers())
+        calibration.update(multipliers)
+
+        for tool in sorted(multipliers):
+            default = whiteboxMemory.multiplier(None, whiteboxUtils.toolDescription(tool))
+            feedback.pushInfo(self.tr('{}: {:.2f} (default {:.2f})').format(tool, multipliers[tool], default))
+
+        whiteboxMemory.saveCalibration(calibration)
+        feedback.pushInfo(self.tr('Calibration saved to {}').format(whiteboxMemory.calibrationPath()))
+
+        return {self.CALIBRATED: len(multipliers)}
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxNative.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+
+from osgeo import gdal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from qgis.core import QgsProcessingException
+from processing.core.ProcessingConfig import ProcessingConfig
+
+from processing_whitebox import whiteboxUtils
+
+WHITEBOX_NATIVE_ENGINE = 'WHITEBOX_NATIVE_ENGINE'
+
+# nodata value WhiteboxTools uses when input has none
+DEFAULT_NODATA = -32768.0
+
+# cells read from every input at once
+BLOCK_CELLS = 1024 * 1024
+
+# output formats written by the engine, other formats are left to
+# WhiteboxTools. GDAL writes .flt with a BIL-style header and .sdat with
+# its own .sgrd, WhiteboxTools is not known to read either back
+DRIVERS = {'.tif': 'GTiff',
+           '.tiff': 'GTiff'}
+
+CREATION_OPTIONS = {'GTiff': ['TILED=YES', 'BIGTIFF=IF_SAFER']}
+
+
+def _flag(values, name):
+    return str(values.get(name, False)).lower() in ('true', '1')
+
+
+# Operations computed in float64, like WhiteboxTools does. Cells which are
+# nodata in any input are nodata in output, operations can add their own
+# invalid cells (e.g. division by zero)
+UNARY = {'AbsoluteValue': lambda a: numpy.abs(a),
+         'ArcCos': lambda a: numpy.arccos(a),
+         'ArcSin': lambda a: numpy.arcsin(a),
+         'ArcTan': lambda a: numpy.arctan(a),
+         'Ceil': lambda a: numpy.ceil(a),
+         'Cos': lambda a: numpy.cos(a),
+         'Cosh': lambda a: numpy.cosh(a),
+         'Exp': lambda a: numpy.exp(a),
+         'Exp2': lambda a: numpy.exp2(a),
+         'Floor': lambda a: numpy.floor(a),
+         'Negate': lambda a: -a,
+         'Sin': lambda a: numpy.sin(a),
+         'Sinh': lambda a: numpy.sinh(a),
+         'Square': lambda a: a * a,
+         'Tan': lambda a: numpy.tan(a),
+         'Tanh': lambda a: numpy.tanh(a)
+         }
+
+BINARY = {'Add': lambda a, b, v: a + b,
+          'And': lambda a, b, v: ((a != 0) & (b != 0)).astype(numpy.float64),
+          'Atan2': lambda a, b, v: numpy.arctan2(a, b),
+          'Divide': lambda a, b, v: numpy.where(b != 0, a / numpy.where(b != 0, b, 1), numpy.nan),
+          'EqualTo': lambda a, b, v: (a == b).astype(numpy.float64),
+          'GreaterThan': lambda a, b, v: ((a >= b) if _flag(v, 'incl_equals') else (a > b)).astype(numpy.float64),
+          'LessThan': lambda a, b, v: ((a <= b) if _flag(v, 'incl_equals') else (a < b)).astype(numpy.float64),
+          'Multiply': lambda a, b, v: a * b,
+          'NotEqualTo': lambda a, b, v: (a != b).astype(numpy.float64),
+          'Or': lambda a, b, v: ((a != 0) | (b != 0)).astype(numpy.float64),
+          'Subtract': lambda a, b, v: a - b,
+          'Xor': lambda a, b, v: ((a != 0) ^ (b != 0)).astype(numpy.float64)
+          }
+
+# division by zero gives nodata, not infinity
+NODATA_ON_NAN = ['Divide']
+
+
+def isAvailable():
+    return numpy is not None
+
+
+def isEnabled():
+    return isAvailable() and bool(ProcessingConfig.getSetting(WHITEBOX_NATIVE_ENGINE))
+
+
+def supports(description, arguments, outputs):
+    # engine is used only when it can read all inputs and write outputs in
+    # requested format
+    name = description['name']
+    if not description.get('native') or (name not in UNARY and name not in BINARY):
+        return False
+
+    values = dict(arguments)
+    for inputName in whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterLayer'):
+        value = values.get(inputName)
+        if not value or not os.path.isfile(value) or value.lower().endswith('.dep'):
+            return False
+
+    return all(os.path.splitext(o)[1].lower() in DRIVERS for o in outputs.values())
+
+
+def run(description, arguments, outputs, feedback):
+    start = time.monotonic()
+    name = description['name']
+    values = dict(arguments)
+    inputNames = whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterLayer')
+    output = outputs[whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterDestination')[0]]
+
+    sources = [gdal.Open(values[n]) for n in inputNames]
+    for n, ds in zip(inputNames, sources):
+        if ds is None:
+            raise QgsProcessingException('Could not open {}: {}'.format(values[n], gdal.GetLastErrorMsg()))
+    xSize, ySize = sources[0].RasterXSize, sources[0].RasterYSize
+    for n, ds in zip(inputNames, sources):
+        if (ds.RasterXSize, ds.RasterYSize) != (xSize, ySize):
+            raise QgsProcessingException('Input rasters must have the same number of rows and columns, {} differs'.format(n))
+
+    bands = [ds.GetRasterBand(1) for ds in sources]
+    noData = [b.GetNoDataValue() if b.GetNoDataValue() is not None else DEFAULT_NODATA for b in bands]
+    outNoData = noData[0]
+
+    # float64 nodata values, like WhiteboxTools default, do not fit float32
+    outType = gdal.GDT_Float64 if bands[0].DataType == gdal.GDT_Float64 else gdal.GDT_Float32
+    outNumpyType = numpy.float64 if outType == gdal.GDT_Float64 else numpy.float32
+
+    driverName = DRIVERS[os.path.splitext(output)[1].lower()]
+    driver = gdal.GetDriverByName(driverName)
+    dst = driver.Create(output, xSize, ySize, 1, outType, CREATION_OPTIONS.get(driverName, []))
+    if dst is None:
+        raise QgsProcessingException('Could not create {}: {}'.format(output, gdal.GetLastErrorMsg()))
+    dst.SetGeoTransform(sources[0].GetGeoTransform())
+    dst.SetProjection(sources[0].GetProjection())
+    outBand = dst.GetRasterBand(1)
+    outBand.SetNoDataValue(outNoData)
+
+    blockRows = max(1, BLOCK_CELLS // xSize)
+    try:
+        for y in range(0, ySize, blockRows):
+            if feedback.isCanceled():
+                raise QgsProcessingException('Native run was canceled')
+
+            rows = min(blockRows, ySize - y)
+            arrays = [b.ReadAsArray(0, y, xSize, rows).astype(numpy.float64) for b in bands]
+            invalid = numpy.zeros((rows, xSize), dtype=bool)
+            for a, nd in zip(arrays, noData):
+                invalid |= a == nd
+
+            with numpy.errstate(all='ignore'):
+                if name in UNARY:
+                    result = UNARY[name](arrays[0])
+                else:
+                    result = BINARY[name](arrays[0], arrays[1], values)
+
+            if name in NODATA_ON_NAN:
+                invalid |= numpy.isnan(result)
+
+            result = numpy.where(invalid, outNoData, result)
+            outBand.WriteArray(result.astype(outNumpyType), 0, y)
+            feedback.setProgress(100.0 * (y + rows) / ySize)
+    except BaseException:
+        outBand = None
+        dst = None
+        whiteboxUtils.removeOutputs([output])
+        raise
+    finally:
+        sources = None
+        bands = None
+
+    outBand.FlushCache()
+    outBand = None
+    dst = None
+    feedback.pushInfo('Computed {} in-process in {:.2f} s'.format(name, time.monotonic() - start))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxPipeline.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shlex
+import shutil
+import tempfile
+
+from qgis.core import QgsProcessingException, QgsProcessingUtils
+
+from processing_whitebox import whiteboxUtils
+from processing_whitebox import whiteboxFormats
+from processing_whitebox.whiteboxBatch import BatchJob, BatchRunner
+
+# RAM-backed file system used for intermediates when they fit
+SHARED_MEMORY_FOLDER = '/dev/shm'
+
+# intermediates can take more space than the input, e.g. when tool
+# converts integer DEM to float rasters
+SCRATCH_SIZE_FACTOR = 2
+
+
+class PipelineStep:
+
+    def __init__(self, tool, arguments):
+        self.tool = tool
+        self.arguments = arguments
+
+    def references(self):
+        # names of pipeline rasters used as inputs
+        destinations = whiteboxUtils.destinationNames(whiteboxUtils.toolDescription(self.tool))
+        return [v[1:] for n, v in self.arguments if v.startswith('$') and n not in destinations]
+
+    def products(self):
+        # names of pipeline rasters created by this step
+        destinations = whiteboxUtils.destinationNames(whiteboxUtils.toolDescription(self.tool))
+        return [v[1:] for n, v in self.arguments if v.startswith('$') and n in destinations]
+
+    def resolve(self, paths):
+        return [(n, paths[v[1:]] if v.startswith('$') else v) for n, v in self.arguments]
+
+
+def parsePipeline(text):
+    # one step per line, tool name followed by name=value pairs. Values
+    # starting with $ refer to pipeline inputs and intermediate rasters
+    steps = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+
+        tokens = shlex.split(line)
+        tool = tokens[0]
+        description = whiteboxUtils.toolDescription(tool)
+        if description is None:
+            raise QgsProcessingException('Line {}: unknown tool {}'.format(number, tool))
+
+        knownNames = whiteboxUtils.parameterNames(description)
+        arguments = []
+        for token in tokens[1:]:
+            if '=' not in token:
+                raise QgsProcessingException('Line {}: invalid argument "{}", expected name=value'.format(number, token))
+            name, value = token.split('=', 1)
+            name = name.lstrip('-')
+            if name not in knownNames:
+                raise QgsProcessingException('Line {}: tool {} has no parameter "{}"'.format(number, tool, name))
+            arguments.append((name, value))
+
+        steps.append(PipelineStep(tool, arguments))
+
+    if len(steps) == 0:
+        raise QgsProcessingException('Pipeline has no steps')
+
+    return steps
+
+
+def validatePipeline(steps, inputs):
+    available = set(inputs)
+    for i, step in enumerate(steps, 1):
+        for name in step.references():
+            if name not in available:
+                raise QgsProcessingException('Step {} ({}): ${} is not an input and is not created by an earlier step'.format(i, step.tool, name))
+        for name in step.products():
+            if name in available:
+                raise QgsProcessingException('Step {} ({}): ${} is already defined'.format(i, step.tool, name))
+            available.add(name)
+
+    return available - set(inputs)
+
+
+def scratchFolder(estimatedSize):
+    if os.path.isdir(SHARED_MEMORY_FOLDER):
+        try:
+            if shutil.disk_usage(SHARED_MEMORY_FOLDER).free > estimatedSize:
+                return tempfile.mkdtemp(prefix='whitebox_', dir=SHARED_MEMORY_FOLDER)
+        except OSError:
+            pass
+
+    return tempfile.mkdtemp(prefix='whitebox_', dir=QgsProcessingUtils.tempFolder())
+
+
+def intermediatePaths(steps, inputs, outputs, folder, extension):
+    paths = dict(inputs)
+    paths.update(outputs)
+    for step in steps:
+        for name in step.products():
+            if name not in paths:
+                paths[name] = os.path.join(folder, '{}.{}'.format(name, extension))
+    return paths
+
+
+def pipelineJobs(steps, paths):
+    # one job per step, depending on jobs which create its inputs
+    jobs = []
+    producers = {}
+    for i, step in enumerate(steps):
+        dependencies = []
+        for name in step.references():
+            if name in producers and producers[name] not in dependencies:
+                dependencies.append(producers[name])
+
+        job = BatchJob('Step {}: {}'.format(i + 1, step.tool),
+                       whiteboxUtils.toolCommand(step.tool, step.resolve(paths)),
+                       [paths[name] for name in step.products()],
+                       dependencies=dependencies)
+        for name in step.products():
+            producers[name] = job
+        jobs.append(job)
+    return jobs
+
+
+def runPipeline(steps, inputs, outputs, feedback, intermediateFormat=None):
+    # outputs requested by user are written directly to their destination,
+    # everything else goes to scratch folder, removed once pipeline is done
+    if intermediateFormat is None:
+        intermediateFormat = whiteboxFormats.intermediateFormat()
+
+    intermediates = validatePipeline(steps, inputs.keys())
+    for name in outputs:
+        if name not in intermediates:
+            raise QgsProcessingException('Requested output ${} is not created by any step'.format(name))
+
+    inputSize = sum(os.path.getsize(p) for p in inputs.values() if os.path.isfile(p))
+    folder = scratchFolder(inputSize * SCRATCH_SIZE_FACTOR * (len(intermediates) - len(outputs)))
+    feedback.pushInfo('Intermediate files folder: {}'.format(folder))
+
+    try:
+        paths = intermediatePaths(steps, inputs, outputs, folder, intermediateFormat)
+        jobs = pipelineJobs(steps, paths)
+
+        # independent steps run concurrently, sharing available cores
+        runner = BatchRunner(feedback)
+        runner.run(jobs)
+        if feedback.isCanceled():
+            raise QgsProcessingException('Pipeline was canceled')
+
+        failed = runner.failedJobs()
+        if failed:
+            raise QgsProcessingException('{} failed: {}'.format(failed[0].label, failed[0].error))
+
+        if whiteboxFormats.optimizeOutputs():
+            whiteboxFormats.optimizeGeoTiffs(outputs.values(), feedback)
+    except QgsProcessingException:
+        if feedback.isCanceled():
+            whiteboxUtils.removeOutputs(outputs.values())
+        raise
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return outputs
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxPipelineAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterFolderDestination
+                      )
+
+from processing_whitebox.whiteboxAlgorithm import whiteboxIcon
+from processing_whitebox import whiteboxPipeline
+from processing_whitebox import whiteboxFormats
+from processing_whitebox import whiteboxStaging
+
+DEFAULT_PIPELINE = '''BreachDepressions dem=$INPUT output=$breached
+D8FlowAccumulation dem=$breached output=$accumulation out_type=cells
+ExtractStreams flow_accum=$accumulation threshold=1000.0 output=$streams'''
+
+
+class WhiteboxPipelineAlgorithm(QgsProcessingAlgorithm):
+
+    INPUT = 'INPUT'
+    PIPELINE = 'PIPELINE'
+    OUTPUTS = 'OUTPUTS'
+    INTERMEDIATE_FORMAT = 'INTERMEDIATE_FORMAT'
+    OUTPUT_DIRECTORY = 'OUTPUT_DIRECTORY'
+
+    def createInstance(self):
+        return self.__class__()
+
+    def name(self):
+        return 'pipeline'
+
+    def displayName(self):
+        return self.tr('Run tools pipeline')
+
+    def group(self):
+        return self.tr('Workflows')
+
+    def groupId(self):
+        return 'workflows'
+
+    def shortHelpString(self):
+        return self.tr('Runs a sequence of WhiteboxTools tools as a single step. Every line '
+                       'of the pipeline is a tool name followed by name=value parameters. '
+                       'Values starting with $ name rasters: $INPUT is the input raster, '
+                       'other names are created by the steps. Intermediate rasters are kept '
+                       'in a temporary folder, in memory when they fit, and removed when '
+                       'the pipeline finishes. Only rasters listed in outputs are saved to '
+                       'the output directory. Steps which do not depend on each other run '
+                       'concurrently.')
+
+    def icon(self):
+        return whiteboxIcon()
+
+    def tr(self, text):
+        return QCoreApplication.translate('WhiteboxPipelineAlgorithm', text)
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterRasterLayer(self.INPUT,
+                                                            self.tr('Input raster')))
+        self.addParameter(QgsProcessingParameterString(self.PIPELINE,
+                                                       self.tr('Pipeline'),
+                                                       DEFAULT_PIPELINE,
+                                                       multiLine=True))
+        self.addParameter(QgsProcessingParameterString(self.OUTPUTS,
+                                                       self.tr('Rasters to save, comma separated (default: last created raster)'),
+                                                       optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.INTERMEDIATE_FORMAT,
+                                                     self.tr('Intermediate rasters format'),
+                                                     options=whiteboxFormats.INTERMEDIATE_FORMATS,
+                                                     defaultValue=whiteboxFormats.INTERMEDIATE_FORMATS.index(whiteboxFormats.intermediateFormat())))
+        self.addParameter(QgsProcessingParameterFolderDestination(self.OUTPUT_DIRECTORY,
+                                                                  self.tr('Output directory')))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        layer = self.parameterAsRasterLayer(parameters, self.INPUT, context)
+        steps = whiteboxPipeline.parsePipeline(self.parameterAsString(parameters, self.PIPELINE, context))
+        intermediateFormat = whiteboxFormats.INTERMEDIATE_FORMATS[self.parameterAsEnum(parameters, self.INTERMEDIATE_FORMAT, context)]
+        directory = self.parameterAsString(parameters, self.OUTPUT_DIRECTORY, context)
+        os.makedirs(directory, exist_ok=True)
+
+        names = [n.strip().lstrip('$') for n in self.parameterAsString(parameters, self.OUTPUTS, context).split(',') if n.strip()]
+        if len(names) == 0:
+            products = steps[-1].products()
+            if len(products) == 0:
+                raise QgsProcessingException(self.tr('Last pipeline step does not create any raster'))
+            names = products[-1:]
+
+        outputs = {name: os.path.join(directory, '{}.{}'.format(name, whiteboxFormats.outputFormat())) for name in names}
+        whiteboxPipeline.runPipeline(steps, {'INPUT': whiteboxStaging.layerFile(layer, feedback)}, outputs, feedback, intermediateFormat)
+
+        return {self.OUTPUT_DIRECTORY: directory}
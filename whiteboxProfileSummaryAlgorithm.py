@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxProfileSummaryAlgorithm.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import html
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterFileDestination
+                      )
+
+from processing_whitebox.whiteboxAlgorithm import whiteboxIcon
+from processing_whitebox import whiteboxProfiling
+
+
+def formatBytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024.0
+    return '{:.1f} TB'.format(size)
+
+
+class WhiteboxProfileSummaryAlgorithm(QgsProcessingAlgorithm):
+
+    TOOLS = 'TOOLS'
+    OUTPUT = 'OUTPUT'
+
+    def createInstance(self):
+        return self.__class__()
+
+    def name(self):
+        return 'profilesummary'
+
+    def displayName(self):
+        return self.tr('Profiling summary')
+
+    def group(self):
+        return self.tr('Workflows')
+
+    def groupId(self):
+        return 'workflows'
+
+    def shortHelpString(self):
+        return self.tr('Creates a report of the slowest WhiteboxTools tools from the profiling '
+                       'log. Profiling is enabled in the provider settings and records wall '
+                       'time, CPU time, peak memory and input and output sizes of every run.')
+
+    def icon(self):
+        return whiteboxIcon()
+
+    def tr(self, text):
+        return QCoreApplication.translate('WhiteboxProfileSummaryAlgorithm', text)
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterNumber(self.TOOLS,
+                                                       self.tr('Number of tools to report'),
+                                                       QgsProcessingParameterNumber.Integer,
+                                                       20,
+                                                       minValue=1))
+        self.addParameter(QgsProcessingParameterFileDestination(self.OUTPUT,
+                                                                self.tr('Profiling summary'),
+                                                                self.tr('HTML files (*.html)')))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        count = self.parameterAsInt(parameters, self.TOOLS, context)
+        output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
+
+        records = whiteboxProfiling.readRecords()
+        if len(records) == 0:
+            raise QgsProcessingException(self.tr('Profiling log {} is empty, enable profiling in provider settings first').format(whiteboxProfiling.logPath()))
+
+        tools = whiteboxProfiling.summary(records)
+        feedback.pushInfo(self.tr('{} runs of {} tools in profiling log').format(len(records), len(tools)))
+
+        headers = [self.tr('Tool'), self.tr('Runs'), self.tr('Failed'), self.tr('Total time, s'),
+                   self.tr('Mean time, s'), self.tr('Max time, s'), self.tr('CPU time, s'),
+                   self.tr('Peak memory'), self.tr('Input'), self.tr('Output'), self.tr('Versions')]
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write('<html><head><meta charset="utf-8"/></head><body>\n')
+            f.write('<h2>{}</h2>\n'.format(self.tr('Slowest WhiteboxTools tools')))
+            f.write('<table border="1" cellspacing="0" cellpadding="3">\n')
+            f.write('<tr>{}</tr>\n'.format(''.join('<th>{}</th>'.format(h) for h in headers)))
+            for s in tools[:count]:
+                cells = [s['tool'], s['runs'], s['failed'],
+                         '{:.2f}'.format(s['wallTime']),
+                         '{:.2f}'.format(s['meanWallTime']),
+                         '{:.2f}'.format(s['maxWallTime']),
+                         '{:.2f}'.format(s['cpuTime']),
+                         formatBytes(s['peakMemory']),
+                         formatBytes(s['inputBytes']),
+                         formatBytes(s['outputBytes']),
+                         ', '.join(s['versions'])]
+                f.write('<tr>{}</tr>\n'.format(''.join('<td>{}</td>'.format(html.escape(str(c))) for c in cells)))
+            f.write('</table>\n</body></html>\n')
+
+        return {self.OUTPUT: output}
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxProfiling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import json
+import time
+import threading
+
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.tools.system import userFolder
+
+WHITEBOX_PROFILING = 'WHITEBOX_PROFILING'
+WHITEBOX_PROFILING_LOG = 'WHITEBOX_PROFILING_LOG'
+WHITEBOX_PROFILING_SIZE = 'WHITEBOX_PROFILING_SIZE'
+
+# number of rotated log files kept next to the current one
+LOG_BACKUPS = 3
+
+_lock = threading.Lock()
+
+
+def isEnabled():
+    return bool(ProcessingConfig.getSetting(WHITEBOX_PROFILING))
+
+
+def defaultLogPath():
+    return os.path.join(userFolder(), 'whitebox_profile.jsonl')
+
+
+def logPath():
+    path = ProcessingConfig.getSetting(WHITEBOX_PROFILING_LOG)
+    return path if path else defaultLogPath()
+
+
+def maxLogSize():
+    try:
+        return float(ProcessingConfig.getSetting(WHITEBOX_PROFILING_SIZE)) * 1024 * 1024
+    except (TypeError, ValueError):
+        return 0
+
+
+def logFiles():
+    # oldest first
+    path = logPath()
+    files = ['{}.{}'.format(path, i) for i in range(LOG_BACKUPS, 0, -1)] + [path]
+    return [f for f in files if os.path.exists(f)]
+
+
+def filesSize(fileNames):
+    size = 0
+    for fileName in fileNames:
+        try:
+            size += os.path.getsize(fileName)
+        except OSError:
+            pass
+    return size
+
+
+def waitProcess(proc):
+    # reaps finished process and returns its resource usage: CPU time in
+    # seconds and peak resident memory in bytes. Returns None where wait4
+    # is not available
+    if not hasattr(os, 'wait4') or proc.returncode is not None:
+        proc.wait()
+        return None
+
+    try:
+        pid, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        proc.wait()
+        return None
+
+    proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status
+
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peakMemory = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return {'cpuTime': usage.ru_utime + usage.ru_stime,
+            'peakMemory': peakMemory}
+
+
+def record(entry):
+    entry = dict(entry)
+    entry['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    line = json.dumps(entry, sort_keys=True) + '\n'
+
+    path = logPath()
+    with _lock:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            limit = maxLogSize()
+            if limit > 0 and os.path.exists(path) and os.path.getsize(path) + len(line) > limit:
+                rotate(path)
+            with open(path, 'a') as f:
+                f.write(line)
+        except OSError:
+            # profiling must never break the run itself
+            pass
+
+
+def rotate(path):
+    for i in range(LOG_BACKUPS - 1, 0, -1):
+        if os.path.exists('{}.{}'.format(path, i)):
+            os.replace('{}.{}'.format(path, i), '{}.{}'.format(path, i + 1))
+    os.replace(path, '{}.1'.format(path))
+
+
+def readRecords():
+    records = []
+    for fileName in logFiles():
+        with open(fileName) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+    return records
+
+
+def summary(records):
+    # per tool statistics, slowest tools (by total wall time) first
+    tools = {}
+    for r in records:
+        s = tools.setdefault(r.get('tool', ''), {'tool': r.get('tool', ''),
+                                                 'runs': 0,
+                                                 'failed': 0,
+                                                 'wallTime': 0.0,
+                                                 'maxWallTime': 0.0,
+                                                 'cpuTime': 0.0,
+                                                 'peakMemory': 0,
+                                                 'inputBytes': 0,
+                                                 'outputBytes': 0,
+                                                 'versions': set()})
+        s['runs'] += 1
+        if r.get('status') != 'finished':
+            s['failed'] += 1
+        s['wallTime'] += r.get('wallTime', 0.0)
+        s['maxWallTime'] = max(s['maxWallTime'], r.get('wallTime', 0.0))
+        s['cpuTime'] += r.get('cpuTime') or 0.0
+        s['peakMemory'] = max(s['peakMemory'], r.get('peakMemory') or 0)
+        s['inputBytes'] += r.get('inputBytes', 0)
+        s['outputBytes'] += r.get('outputBytes', 0)
+        if r.get('version'):
+            s['versions'].add(r['version'])
+
+    result = sorted(tools.values(), key=lambda s: s['wallTime'], reverse=True)
+    for s in result:
+        s['meanWallTime'] = s['wallTime'] / s['runs']
+        s['versions'] = sorted(s['versions'])
+    return result
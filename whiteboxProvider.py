@@ -25,19 +25,27 @@ __copyright__ = '(C) 2017, Alexander Bruy'
 
 __revision__ = '$Format:%H$'
 
-import os
-
-from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QCoreApplication
 
 from qgis.core import QgsProcessingProvider, QgsMessageLog
 
 from processing.core.ProcessingConfig import ProcessingConfig, Setting
 
-from processing_whitebox.whiteboxAlgorithm import WhiteboxAlgorithm
+from processing_whitebox.whiteboxAlgorithm import WhiteboxAlgorithm, whiteboxIcon, clearParameterPrototypes
+from processing_whitebox.whiteboxBatchAlgorithm import WhiteboxBatchAlgorithm
+from processing_whitebox.whiteboxPipelineAlgorithm import WhiteboxPipelineAlgorithm
+from processing_whitebox.whiteboxLidarBatchAlgorithm import WhiteboxLidarBatchAlgorithm
+from processing_whitebox.whiteboxProfileSummaryAlgorithm import WhiteboxProfileSummaryAlgorithm
+from processing_whitebox.whiteboxMemoryCalibrationAlgorithm import WhiteboxMemoryCalibrationAlgorithm
 from processing_whitebox import whiteboxUtils
-
-pluginPath = os.path.dirname(__file__)
+from processing_whitebox import whiteboxCache
+from processing_whitebox import whiteboxProfiling
+from processing_whitebox import whiteboxDiscovery
+from processing_whitebox import whiteboxStaging
+from processing_whitebox import whiteboxFormats
+from processing_whitebox import whiteboxMemory
+from processing_whitebox import whiteboxNative
+from processing_whitebox import whiteboxLogs
 
 
 class WhiteboxProvider(QgsProcessingProvider):
@@ -57,7 +65,7 @@ class WhiteboxProvider(QgsProcessingProvider):
         return 'WhiteBox Tools ({})'.format(version) if version is not None else 'WhiteBox Tools'
 
     def icon(self):
-        return QIcon(os.path.join(pluginPath, 'icons', 'whiteboxtools.png'))
+        return whiteboxIcon()
 
     def load(self):
         ProcessingConfig.settingIcons[self.name()] = self.icon()
@@ -70,10 +78,89 @@ class WhiteboxProvider(QgsProcessingProvider):
                                             self.tr('Whitebox Tools executable'),
                                             whiteboxUtils.whiteboxToolsExecutable(),
                                             valuetype=Setting.FILE))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxDiscovery.WHITEBOX_DISCOVERY,
+                                            self.tr('Discover algorithms from installed Whitebox Tools executable'),
+                                            False))
         ProcessingConfig.addSetting(Setting(self.name(),
                                             whiteboxUtils.WHITEBOX_VERBOSE,
                                             self.tr('Log commands output'),
                                             False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxLogs.WHITEBOX_LOG_FOLDER,
+                                            self.tr('Folder for full output of every run (when logging is enabled)'),
+                                            whiteboxLogs.defaultLogFolder(),
+                                            valuetype=Setting.FOLDER))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxLogs.WHITEBOX_LOG_FILES,
+                                            self.tr('Number of run output files to keep (0 = do not write them)'),
+                                            100))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxFormats.WHITEBOX_OUTPUT_FORMAT,
+                                            self.tr('Default output raster format'),
+                                            whiteboxFormats.RASTER_FORMATS[0],
+                                            valuetype=Setting.SELECTION,
+                                            options=whiteboxFormats.RASTER_FORMATS))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxFormats.WHITEBOX_INTERMEDIATE_FORMAT,
+                                            self.tr('Format of intermediate rasters in pipelines'),
+                                            whiteboxFormats.INTERMEDIATE_FORMATS[0],
+                                            valuetype=Setting.SELECTION,
+                                            options=whiteboxFormats.INTERMEDIATE_FORMATS))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxFormats.WHITEBOX_OPTIMIZE_OUTPUTS,
+                                            self.tr('Compress GeoTIFF outputs and build overviews'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxFormats.WHITEBOX_BACKGROUND_OVERVIEWS,
+                                            self.tr('Build overviews and statistics of raster outputs in background'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxNative.WHITEBOX_NATIVE_ENGINE,
+                                            self.tr('Compute simple per-cell tools in-process (requires NumPy)'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxUtils.WHITEBOX_MAX_CONCURRENCY,
+                                            self.tr('Maximum number of concurrent runs in batch mode (0 = number of CPU cores)'),
+                                            0))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxUtils.WHITEBOX_THREADS,
+                                            self.tr('Number of CPU cores shared by all WhiteBox Tools runs (0 = all cores)'),
+                                            0))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxMemory.WHITEBOX_MEMORY_ADMISSION,
+                                            self.tr('Queue runs until their estimated memory is available'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxMemory.WHITEBOX_MEMORY_LIMIT,
+                                            self.tr('Memory available to WhiteBox Tools runs (MB, 0 = 80% of physical memory)'),
+                                            0))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxCache.WHITEBOX_CACHE,
+                                            self.tr('Reuse results of identical runs'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxCache.WHITEBOX_CACHE_FOLDER,
+                                            self.tr('Results cache folder'),
+                                            whiteboxCache.defaultCacheFolder(),
+                                            valuetype=Setting.FOLDER))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxCache.WHITEBOX_CACHE_SIZE,
+                                            self.tr('Maximum results cache size (MB)'),
+                                            4096))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxProfiling.WHITEBOX_PROFILING,
+                                            self.tr('Record profiling data of every run'),
+                                            False))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxProfiling.WHITEBOX_PROFILING_LOG,
+                                            self.tr('Profiling log file'),
+                                            whiteboxProfiling.defaultLogPath(),
+                                            valuetype=Setting.FILE))
+        ProcessingConfig.addSetting(Setting(self.name(),
+                                            whiteboxProfiling.WHITEBOX_PROFILING_SIZE,
+                                            self.tr('Maximum profiling log size before rotation (MB)'),
+                                            10))
         ProcessingConfig.readSettings()
         self.refreshAlgorithms()
         return True
@@ -81,7 +168,26 @@ class WhiteboxProvider(QgsProcessingProvider):
     def unload(self):
         ProcessingConfig.removeSetting(whiteboxUtils.WHITEBOX_ACTIVE)
         ProcessingConfig.removeSetting(whiteboxUtils.WHITEBOX_EXECUTABLE)
+        ProcessingConfig.removeSetting(whiteboxDiscovery.WHITEBOX_DISCOVERY)
         ProcessingConfig.removeSetting(whiteboxUtils.WHITEBOX_VERBOSE)
+        ProcessingConfig.removeSetting(whiteboxLogs.WHITEBOX_LOG_FOLDER)
+        ProcessingConfig.removeSetting(whiteboxLogs.WHITEBOX_LOG_FILES)
+        ProcessingConfig.removeSetting(whiteboxFormats.WHITEBOX_OUTPUT_FORMAT)
+        ProcessingConfig.removeSetting(whiteboxFormats.WHITEBOX_INTERMEDIATE_FORMAT)
+        ProcessingConfig.removeSetting(whiteboxFormats.WHITEBOX_OPTIMIZE_OUTPUTS)
+        ProcessingConfig.removeSetting(whiteboxFormats.WHITEBOX_BACKGROUND_OVERVIEWS)
+        ProcessingConfig.removeSetting(whiteboxNative.WHITEBOX_NATIVE_ENGINE)
+        ProcessingConfig.removeSetting(whiteboxUtils.WHITEBOX_MAX_CONCURRENCY)
+        ProcessingConfig.removeSetting(whiteboxUtils.WHITEBOX_THREADS)
+        ProcessingConfig.removeSetting(whiteboxMemory.WHITEBOX_MEMORY_ADMISSION)
+        ProcessingConfig.removeSetting(whiteboxMemory.WHITEBOX_MEMORY_LIMIT)
+        ProcessingConfig.removeSetting(whiteboxCache.WHITEBOX_CACHE)
+        ProcessingConfig.removeSetting(whiteboxCache.WHITEBOX_CACHE_FOLDER)
+        ProcessingConfig.removeSetting(whiteboxCache.WHITEBOX_CACHE_SIZE)
+        ProcessingConfig.removeSetting(whiteboxProfiling.WHITEBOX_PROFILING)
+        ProcessingConfig.removeSetting(whiteboxProfiling.WHITEBOX_PROFILING_LOG)
+        ProcessingConfig.removeSetting(whiteboxProfiling.WHITEBOX_PROFILING_SIZE)
+        whiteboxStaging.clear()
 
     def isActive(self):
         return ProcessingConfig.getSetting(whiteboxUtils.WHITEBOX_ACTIVE)
@@ -93,30 +199,46 @@ class WhiteboxProvider(QgsProcessingProvider):
         return 'shp'
 
     def defaultRasterFileExtension(self):
-        return 'tif'
+        return whiteboxFormats.outputFormat()
 
     def supportedOutputRasterLayerExtensions(self):
-        return ['tif', 'flt', 'sdat', 'rdc', 'dep']
+        return list(whiteboxFormats.RASTER_FORMATS)
 
     def supportsNonFileBasedOutput(self):
         return False
 
     def loadAlgorithms(self):
         self.algs = []
-        folder = whiteboxUtils.descriptionPath()
-
-        for descriptionFile in os.listdir(folder):
-            if descriptionFile.endswith('txt'):
-                try:
-                    alg = WhiteboxAlgorithm(os.path.join(folder, descriptionFile))
-                    if alg.name().strip() != '':
-                        self.algs.append(alg)
-                    else:
-                        QgsMessageLog.logMessage(self.tr('Could not load WhiteBox Tools algorithm from file: {}'.format(descriptionFile)),
-                                                 self.tr('Processing'), QgsMessageLog.CRITICAL)
-                except Exception as e:
-                    QgsMessageLog.logMessage(self.tr('Could not load WhiteBox Tools algorithm from file: {}\n{}'.format(descriptionFile, str(e))),
+
+        # called again by refreshAlgorithms() when settings are changed,
+        # the executable may be a different one now
+        whiteboxUtils.clearCatalog()
+        clearParameterPrototypes()
+
+        try:
+            descriptions = whiteboxUtils.loadCatalog()
+        except Exception as e:
+            QgsMessageLog.logMessage(self.tr('Could not load WhiteBox Tools algorithms catalog\n{}'.format(str(e))),
+                                     self.tr('Processing'), QgsMessageLog.CRITICAL)
+            return
+
+        for description in descriptions:
+            try:
+                alg = WhiteboxAlgorithm(description)
+                if alg.name().strip() != '':
+                    self.algs.append(alg)
+                else:
+                    QgsMessageLog.logMessage(self.tr('Could not load WhiteBox Tools algorithm: {}'.format(description)),
                                              self.tr('Processing'), QgsMessageLog.CRITICAL)
+            except Exception as e:
+                QgsMessageLog.logMessage(self.tr('Could not load WhiteBox Tools algorithm: {}\n{}'.format(description.get('name', ''), str(e))),
+                                         self.tr('Processing'), QgsMessageLog.CRITICAL)
+
+        self.algs.append(WhiteboxBatchAlgorithm())
+        self.algs.append(WhiteboxPipelineAlgorithm())
+        self.algs.append(WhiteboxLidarBatchAlgorithm())
+        self.algs.append(WhiteboxProfileSummaryAlgorithm())
+        self.algs.append(WhiteboxMemoryCalibrationAlgorithm())
 
         for a in self.algs:
             self.addAlgorithm(a)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxStaging.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import time
+import shutil
+import tempfile
+import itertools
+import threading
+
+from osgeo import gdal
+
+from qgis.core import (QgsProcessingException,
+                       QgsProcessingUtils,
+                       QgsRasterFileWriter,
+                       QgsRasterPipe
+                      )
+
+# raster formats WhiteboxTools reads itself
+NATIVE_EXTENSIONS = ['.tif', '.tiff', '.dep', '.flt', '.asc', '.sdat', '.sgrd', '.rdc', '.rst', '.grd']
+
+# source key -> staged file, kept for the whole session
+_staged = {}
+_folder = None
+_lock = threading.Lock()
+
+# staged file names are never reused, even when a staged file was removed
+_counter = itertools.count()
+
+
+def isNative(layer):
+    source = layer.source()
+    return (layer.providerType() == 'gdal' and
+            os.path.isfile(source) and
+            os.path.splitext(source)[1].lower() in NATIVE_EXTENSIONS)
+
+
+def sourceKey(layer):
+    # local files are identified by modification time and size too, so
+    # changed source is staged again
+    source = layer.source()
+    try:
+        st = os.stat(source)
+        return (layer.providerType(), source, st.st_mtime, st.st_size)
+    except OSError:
+        return (layer.providerType(), source)
+
+
+def stagingFolder():
+    # staged copies live for the whole session, so they go to the
+    # Processing temp folder on disk. Keeping them in RAM would hold memory
+    # of every layer ever staged until QGIS exits
+    global _folder
+    with _lock:
+        if _folder is None:
+            _folder = tempfile.mkdtemp(prefix='whitebox_staging_', dir=QgsProcessingUtils.tempFolder())
+        return _folder
+
+
+def layerFile(layer, feedback=None):
+    # file WhiteboxTools can read for the given layer. Layers in other
+    # formats or from other providers are converted to GeoTIFF once per
+    # session
+    if isNative(layer):
+        return layer.source()
+
+    key = sourceKey(layer)
+    with _lock:
+        fileName = _staged.get(key)
+    if fileName is not None and os.path.exists(fileName):
+        if feedback is not None:
+            feedback.pushInfo('Using staged copy of {}: {}'.format(layer.name(), fileName))
+        return fileName
+
+    # conversion runs without the lock, runs staging other layers do not
+    # wait for it
+    start = time.monotonic()
+    fileName = os.path.join(stagingFolder(), 'staged_{}.tif'.format(next(_counter)))
+    if layer.providerType() == 'gdal':
+        if gdal.Translate(fileName, layer.source(), format='GTiff', creationOptions=['TILED=YES', 'BIGTIFF=IF_SAFER']) is None:
+            raise QgsProcessingException('Could not stage {}: {}'.format(layer.name(), gdal.GetLastErrorMsg()))
+    else:
+        writeLayer(layer, fileName)
+
+    with _lock:
+        # same layer staged concurrently by another run, its copy is kept
+        staged = _staged.get(key)
+        if staged is not None and os.path.exists(staged):
+            duplicate, fileName = fileName, staged
+        else:
+            duplicate = None
+            _staged[key] = fileName
+    if duplicate is not None:
+        os.remove(duplicate)
+
+    if feedback is not None:
+        feedback.pushInfo('Staged {} to {} in {:.2f} s'.format(layer.name(), fileName, time.monotonic() - start))
+    return fileName
+
+
+def writeLayer(layer, fileName):
+    provider = layer.dataProvider()
+    if provider.xSize() == 0 or provider.ySize() == 0:
+        raise QgsProcessingException('Layer {} has no native resolution and can not be passed to WhiteBox Tools'.format(layer.name()))
+
+    pipe = QgsRasterPipe()
+    if not pipe.set(provider.clone()):
+        raise QgsProcessingException('Could not read layer {}'.format(layer.name()))
+
+    writer = QgsRasterFileWriter(fileName)
+    writer.setOutputFormat('GTiff')
+    writer.setCreateOptions(['TILED=YES', 'BIGTIFF=IF_SAFER'])
+    error = writer.writeRaster(pipe, provider.xSize(), provider.ySize(), provider.extent(), provider.crs())
+    if error != QgsRasterFileWriter.NoError:
+        raise QgsProcessingException('Could not stage layer {}, error code {}'.format(layer.name(), error))
+
+
+def clear():
+    global _folder
+    with _lock:
+        _staged.clear()
+        if _folder is not None:
+            shutil.rmtree(_folder, ignore_errors=True)
+            _folder = None
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    whiteboxTiling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by agent
+    Email                : agent at local
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+__author__ = 'agent'
+__date__ = 'October 2026'
+__copyright__ = '(C) 2026, agent'
+
+# This will get replaced with a git SHA1 when you do a git archive
+
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+
+from osgeo import gdal, osr
+
+from qgis.core import QgsProcessingException, QgsProcessingUtils
+
+from processing_whitebox import whiteboxUtils
+from processing_whitebox.whiteboxFormats import openRaster
+from processing_whitebox.whiteboxBatch import BatchJob, BatchRunner
+
+
+def haloSize(tiling, arguments):
+    values = dict(arguments)
+    size = 0
+    for name in tiling.get('haloParameters', []):
+        try:
+            size = max(size, int(float(values[name])) // 2)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return tiling.get('haloCells', 0) + size
+
+
+def tileWindows(xSize, ySize, tileSize, halo):
+    # core window of every tile together with the window expanded by halo
+    # and clipped to raster extent
+    windows = []
+    for yOff in range(0, ySize, tileSize):
+        for xOff in range(0, xSize, tileSize):
+            width = min(tileSize, xSize - xOff)
+            height = min(tileSize, ySize - yOff)
+            bx = max(0, xOff - halo)
+            by = max(0, yOff - halo)
+            bw = min(xSize, xOff + width + halo) - bx
+            bh = min(ySize, yOff + height + halo) - by
+            windows.append(((xOff, yOff, width, height), (bx, by, bw, bh)))
+    return windows
+
+
+def isGeographic(ds):
+    srs = osr.SpatialReference()
+    return srs.ImportFromWkt(ds.GetProjection() or '') == 0 and bool(srs.IsGeographic())
+
+
+def tileExtractor(extracts, window):
+    # sources are opened by every job, GDAL datasets must not be shared
+    # between threads
+    def extract(job):
+        for source, tile in extracts:
+            if gdal.Translate(tile, source, srcWin=list(window)) is None:
+                raise QgsProcessingException('Could not extract {} of {}: {}'.format(job.label, source, gdal.GetLastErrorMsg()))
+    return extract
+
+
+def runTiled(tool, description, arguments, outputs, tileSize, feedback):
+    rasterInputs = whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterLayer')
+    rasterOutputs = whiteboxUtils.parameterNames(description, 'QgsProcessingParameterRasterDestination')
+    if len(rasterOutputs) != 1 or set(outputs.keys()) != set(rasterOutputs):
+        raise QgsProcessingException('Tiled mode supports only tools with a single raster output')
+
+    output = outputs[rasterOutputs[0]]
+    if os.path.splitext(output)[1].lower() not in ('.tif', '.tiff'):
+        raise QgsProcessingException('Tiled mode writes GeoTIFF output only')
+
+    values = dict(arguments)
+    sources = {name: openRaster(values[name]) for name in rasterInputs if name in values}
+    if len(sources) == 0:
+        raise QgsProcessingException('Tool has no raster inputs to tile')
+
+    reference = list(sources.values())[0]
+    xSize, ySize = reference.RasterXSize, reference.RasterYSize
+    for name, ds in sources.items():
+        if (ds.RasterXSize, ds.RasterYSize) != (xSize, ySize) or ds.GetGeoTransform() != reference.GetGeoTransform():
+            raise QgsProcessingException('Tiled mode requires all input rasters to share the same grid, {} differs'.format(name))
+
+    if description['tiling'].get('projectedOnly') and isGeographic(reference):
+        raise QgsProcessingException('{} can not be run in tiles on rasters in geographic coordinates, every tile would '
+                                     'use a different z-factor. Run it without tiling or reproject the input'.format(tool))
+
+    halo = haloSize(description['tiling'], arguments)
+    windows = tileWindows(xSize, ySize, tileSize, halo)
+    feedback.pushInfo('Processing {}x{} raster in {} tiles of {} cells with {} cells overlap'.format(xSize, ySize, len(windows), tileSize, halo))
+
+    folder = tempfile.mkdtemp(prefix='whitebox_tiles_', dir=QgsProcessingUtils.tempFolder())
+    try:
+        jobs = []
+        for i, (core, buffered) in enumerate(windows):
+            tileArguments = []
+            extracts = []
+            for name, value in arguments:
+                if name in sources:
+                    tile = os.path.join(folder, '{}_{}.tif'.format(name, i))
+                    extracts.append((value, tile))
+                    value = tile
+                elif name == rasterOutputs[0]:
+                    value = os.path.join(folder, 'output_{}.tif'.format(i))
+                tileArguments.append((name, value))
+
+            # inputs of a tile are extracted by its job, so extraction of
+            # later tiles overlaps processing of earlier ones. Extracted
+            # inputs are removed as soon as the tile is done
+            tileOutput = dict(tileArguments)[rasterOutputs[0]]
+            jobs.append(BatchJob('tile {}'.format(i), whiteboxUtils.toolCommand(tool, tileArguments), [tileOutput],
+                                 temporary=[tile for source, tile in extracts],
+                                 prepare=tileExtractor(extracts, buffered)))
+
+        runner = BatchRunner(feedback)
+        runner.run(jobs)
+        if feedback.isCanceled():
+            raise QgsProcessingException('Tiled run was canceled')
+        failed = runner.failedJobs()
+        if failed:
+            raise QgsProcessingException('{} of {} tiles failed'.format(len(failed), len(jobs)))
+
+        feedback.pushInfo('Mosaicking tiles')
+        mosaic(output, reference, windows, [j.outputs[0] for j in jobs])
+    finally:
+        sources = None
+        reference = None
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def mosaic(output, reference, windows, tileFiles):
+    # only core window of every tile is copied, overlapping halo cells
+    # are discarded
+    first = openRaster(tileFiles[0])
+    firstBand = first.GetRasterBand(1)
+
+    driver = gdal.GetDriverByName('GTiff')
+    ds = driver.Create(output,
+                       reference.RasterXSize,
+                       reference.RasterYSize,
+                       first.RasterCount,
+                       firstBand.DataType,
+                       ['TILED=YES', 'BIGTIFF=IF_SAFER'])
+    if ds is None:
+        raise QgsProcessingException('Could not create {}: {}'.format(output, gdal.GetLastErrorMsg()))
+    ds.SetGeoTransform(reference.GetGeoTransform())
+    ds.SetProjection(reference.GetProjection())
+    for b in range(1, first.RasterCount + 1):
+        noData = first.GetRasterBand(b).GetNoDataValue()
+        if noData is not None:
+            ds.GetRasterBand(b).SetNoDataValue(noData)
+    first = None
+
+    for ((xOff, yOff, width, height), (bx, by, bw, bh)), fileName in zip(windows, tileFiles):
+        tile = openRaster(fileName)
+        for b in range(1, tile.RasterCount + 1):
+            band = ds.GetRasterBand(b)
+            data = tile.GetRasterBand(b).ReadRaster(xOff - bx, yOff - by, width, height, buf_type=band.DataType)
+            band.WriteRaster(xOff, yOff, width, height, data, buf_type=band.DataType)
+        tile = None
+
+    ds.FlushCache()
+    ds = None
@@ -27,18 +27,51 @@ __revision__ = '$Format:%H$'
 
 import os
 import re
+import json
+import shlex
+import signal
+import shutil
+import time
+import threading
 import subprocess
 
-from qgis.core import QgsMessageLog, QgsProcessingFeedback
+from qgis.core import QgsMessageLog, QgsProcessingFeedback, QgsProcessingException
 from processing.core.ProcessingLog import ProcessingLog
 from processing.core.ProcessingConfig import ProcessingConfig
 
+from processing_whitebox import whiteboxDescriptions
+from processing_whitebox import whiteboxProfiling
+from processing_whitebox import whiteboxDiscovery
+from processing_whitebox import whiteboxMemory
+from processing_whitebox import whiteboxLogs
+
 versionRegex = re.compile('([\d.]+)')
 progressRegex = re.compile('\d+')
 
 WHITEBOX_ACTIVE = 'WHITEBOX_ACTIVE'
 WHITEBOX_EXECUTABLE = 'WHITEBOX_EXECUTABLE'
 WHITEBOX_VERBOSE = 'WHITEBOX_VERBOSE'
+WHITEBOX_MAX_CONCURRENCY = 'WHITEBOX_MAX_CONCURRENCY'
+WHITEBOX_THREADS = 'WHITEBOX_THREADS'
+
+# how often progress and console output are passed to feedback
+UPDATES_PER_SECOND = 10
+
+# lines of tool output included in error message of failed run
+ERROR_LINES = 20
+
+# seconds canceled process has to exit before it is killed
+TERMINATE_TIMEOUT = 5
+
+# companion files written by WhiteboxTools and GDAL next to raster outputs
+SIDECAR_EXTENSIONS = {'.dep': ['.tas'],
+                      '.flt': ['.hdr', '.flt.aux.xml', '.flt.ovr'],
+                      '.sdat': ['.sgrd', '.sdat.aux.xml', '.sdat.ovr'],
+                      '.rdc': ['.rst'],
+                      '.tif': ['.tif.aux.xml', '.tif.ovr']}
+
+# first WhiteboxTools release accepting --max_procs
+MAX_PROCS_VERSION = (1, 4, 0)
 
 
 def whiteboxToolsExecutable():
@@ -46,60 +79,489 @@ def whiteboxToolsExecutable():
     return filePath if filePath is not None else ''
 
 
+def maxConcurrency():
+    try:
+        value = int(ProcessingConfig.getSetting(WHITEBOX_MAX_CONCURRENCY))
+    except (TypeError, ValueError):
+        value = 0
+    return value if value > 0 else os.cpu_count() or 1
+
+
+def availableCpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def totalThreads():
+    try:
+        value = int(ProcessingConfig.getSetting(WHITEBOX_THREADS))
+    except (TypeError, ValueError):
+        value = 0
+    cpus = len(availableCpus())
+    return min(value, cpus) if value > 0 else cpus
+
+
+class ThreadGovernor:
+    # Splits available CPU cores between concurrently running WhiteboxTools
+    # processes. Every tool is multithreaded and by default uses all cores,
+    # so without coordination N concurrent runs start N times more threads
+    # than there are cores.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.runs = dict()
+        self.nextId = 0
+
+    def acquire(self, concurrency=1):
+        with self.lock:
+            cpus = availableCpus()[:totalThreads()]
+            used = set()
+            for runCpus in self.runs.values():
+                used.update(runCpus)
+            free = [c for c in cpus if c not in used]
+
+            # share of the budget for one of "concurrency" runs, limited by
+            # what other runs left. When everything is taken run still gets
+            # single core, least loaded one
+            share = max(1, len(cpus) // max(1, concurrency))
+            if free:
+                allocated = free[:share]
+            else:
+                load = {c: 0 for c in cpus}
+                for runCpus in self.runs.values():
+                    for c in runCpus:
+                        load[c] = load.get(c, 0) + 1
+                allocated = [min(load, key=load.get)]
+
+            self.nextId += 1
+            self.runs[self.nextId] = allocated
+            return self.nextId, allocated
+
+    def release(self, runId):
+        with self.lock:
+            self.runs.pop(runId, None)
+
+    def allocation(self):
+        with self.lock:
+            return {'total': totalThreads(),
+                    'runs': [len(c) for c in self.runs.values()]}
+
+
+threadGovernor = ThreadGovernor()
+
+
+def threadAllocation():
+    return threadGovernor.allocation()
+
+
 def descriptionPath():
     return os.path.normpath(os.path.join(os.path.dirname(__file__), "descriptions"))
 
 
-def version():
-    commands = whiteboxToolsExecutable()
-    if commands == '':
-        commands = 'whitebox_tools'
-    commands += ' --version'
-
-    with subprocess.Popen([commands],
-                          shell=True,
-                          stdout=subprocess.PIPE,
-                          stdin=subprocess.DEVNULL,
-                          stderr=subprocess.STDOUT,
-                          universal_newlines=True) as proc:
+def catalogPath():
+    return os.path.join(descriptionPath(), whiteboxDescriptions.CATALOG_FILE)
+
+
+_catalog = None
+
+
+def loadCatalog():
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+
+    if whiteboxDiscovery.isEnabled():
         try:
+            _catalog = whiteboxDiscovery.loadCatalog(_executableKey()[0], _probeVersion)
+        except (OSError, ValueError) as e:
+            QgsMessageLog.logMessage('Could not discover WhiteBox Tools algorithms: {}'.format(str(e)), 'Processing', QgsMessageLog.WARNING)
+        if _catalog:
+            return _catalog
+        QgsMessageLog.logMessage('Using bundled WhiteBox Tools descriptions', 'Processing', QgsMessageLog.WARNING)
+
+    # fall back to parsing individual description files when catalog
+    # was not generated yet
+    if not os.path.exists(catalogPath()):
+        _catalog = whiteboxDescriptions.readDescriptions(descriptionPath())
+    else:
+        with open(catalogPath()) as f:
+            _catalog = json.load(f)['algorithms']
+
+    return _catalog
+
+
+def clearCatalog():
+    global _catalog
+    _catalog = None
+
+
+def parameterNames(description, parameterType=None):
+    # names of tool parameters, optionally only of the given type
+    names = []
+    for line in description['parameters']:
+        tokens = line.split('|')
+        if parameterType is None or tokens[0] == parameterType:
+            names.append(tokens[1])
+    return names
+
+
+def destinationNames(description):
+    names = []
+    for line in description['parameters']:
+        tokens = line.split('|')
+        if tokens[0].endswith('Destination'):
+            names.append(tokens[1])
+    return names
+
+
+def toolDescription(name):
+    for description in loadCatalog():
+        if description['name'] == name:
+            return description
+    return None
+
+
+def _executableKey():
+    # path, mtime and size, so replacing binary in-place invalidates cache too
+    executable = whiteboxToolsExecutable()
+    if executable == '':
+        executable = 'whitebox_tools'
+
+    executable = shutil.which(executable) or executable
+    try:
+        st = os.stat(executable)
+        return (executable, st.st_mtime, st.st_size)
+    except OSError:
+        return (executable, None, None)
+
+
+# keyed by executable path, mtime and size, so a different or replaced
+# executable is probed again
+_versionCache = {}
+_versionLock = threading.Lock()
+
+
+def version():
+    key = _executableKey()
+    with _versionLock:
+        if key not in _versionCache:
+            _versionCache[key] = _probeVersion(key[0])
+        return _versionCache[key]
+
+
+def versionTuple():
+    v = version()
+    if v is None:
+        return None
+    return tuple(int(i) for i in v.strip('.').split('.') if i.isdigit())
+
+
+def supportsMaxProcs():
+    v = versionTuple()
+    return v is not None and v >= MAX_PROCS_VERSION
+
+
+def _probeVersion(executable):
+    try:
+        with subprocess.Popen([executable, '--version'],
+                              stdout=subprocess.PIPE,
+                              stdin=subprocess.DEVNULL,
+                              stderr=subprocess.STDOUT,
+                              universal_newlines=True) as proc:
             for line in proc.stdout:
                 if line.startswith('whitebox-tools'):
                     return versionRegex.search(line.strip()).group(0)
             return None
-        except:
-            return None
+    except (OSError, AttributeError):
+        return None
+
+
+class OutputReader(threading.Thread):
+    # Reads tool output in a separate thread. Progress messages are reduced
+    # to the latest reported value and other lines are collected until
+    # consumer takes them
+
+    def __init__(self, stream):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.progress = None
+        self.lines = []
+
+    def run(self):
+        try:
+            for line in iter(self.stream.readline, ''):
+                line = line.rstrip('\n')
+                match = progressRegex.search(line) if '%' in line else None
+                with self.lock:
+                    if match is not None:
+                        self.progress = int(match.group(0))
+                    else:
+                        self.lines.append(line)
+        except (OSError, ValueError):
+            # stream closed when process was terminated
+            pass
+        finally:
+            self.finished.set()
+
+    def take(self):
+        with self.lock:
+            progress, lines = self.progress, self.lines
+            self.progress = None
+            self.lines = []
+        return progress, lines
+
+
+def toolCommand(tool, arguments):
+    wb = whiteboxToolsExecutable()
+    if wb == '':
+        wb = 'whitebox_tools'
+
+    command = [wb]
+    command.append('--run={}'.format(tool))
+    for name, value in arguments:
+        command.append('--{}={}'.format(name, value))
+    command.append('-v')
 
+    return command
 
-def execute(commands, feedback=None):
+
+def commandLine(commands):
+    if os.name == 'nt':
+        return subprocess.list2cmdline(commands)
+    return ' '.join(shlex.quote(c) for c in commands)
+
+
+# Every run starts a new WhiteboxTools process. The executable has no
+# server mode and takes a single tool per invocation, so there is no
+# warm process queued runs could be handed to
+def execute(commands, feedback=None, concurrency=1):
     if feedback is None:
         feedback = QgsProcessingFeedback()
 
-    fused_command = ' '.join([str(c) for c in commands])
+    # memory-hungry runs wait until their estimated peak memory fits
+    # next to runs already in progress
+    memoryEstimate = None
+    if whiteboxMemory.isEnabled() or whiteboxProfiling.isEnabled():
+        tool, inputs, outputs = commandFiles(commands)
+        memoryEstimate = whiteboxMemory.estimate(tool, toolDescription(tool) if tool else None, inputs)
+
+    memoryId = None
+    if whiteboxMemory.isEnabled():
+        memoryId = whiteboxMemory.memoryGovernor.acquire(memoryEstimate[0], feedback)
+
+    try:
+        runId, cpus = threadGovernor.acquire(concurrency)
+        try:
+            _execute(commands, feedback, cpus, memoryEstimate)
+        finally:
+            threadGovernor.release(runId)
+    finally:
+        if memoryId is not None:
+            whiteboxMemory.memoryGovernor.release(memoryId)
+
+
+def _execute(commands, feedback, cpus, memoryEstimate=None):
+    # limit number of threads tool starts. Older releases do not know the
+    # --max_procs flag but respect CPU affinity, which we can set on Linux
+    useAffinity = False
+    if supportsMaxProcs():
+        commands = list(commands) + ['--max_procs={}'.format(len(cpus))]
+    elif hasattr(os, 'sched_setaffinity') and len(cpus) < len(availableCpus()):
+        useAffinity = True
+    feedback.pushInfo('Threads available to WhiteBox Tools: {}'.format(len(cpus)))
+
+    # arguments are passed to the process as is, without going through
+    # the shell, quoting is only needed for the logged command line
+    commands = [str(c) for c in commands]
+    fused_command = commandLine(commands)
     QgsMessageLog.logMessage(fused_command, 'Processing', QgsMessageLog.INFO)
     feedback.pushInfo('WhiteBox Tools command:')
     feedback.pushCommandInfo(fused_command)
     feedback.pushInfo('WhiteBox Tools command output:')
 
-    loglines = []
-    with subprocess.Popen(fused_command,
-                          shell=True,
-                          stdout=subprocess.PIPE,
-                          stdin=subprocess.DEVNULL,
-                          stderr=subprocess.STDOUT,
-                          universal_newlines=True) as proc:
+    # start tool in its own process group, so it can be stopped together
+    # with anything it spawns
+    if os.name == 'nt':
+        groupArgs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        groupArgs = {'start_new_session': True}
+
+    profiling = whiteboxProfiling.isEnabled()
+    if profiling:
+        tool, inputs, outputs = commandFiles(commands)
+        inputBytes = whiteboxProfiling.filesSize(inputs)
+    usage = None
+    startTime = time.monotonic()
+
+    # whole output goes to a per-run log file, only its tail is kept in
+    # memory for the message log
+    verbose = ProcessingConfig.getSetting(WHITEBOX_VERBOSE)
+
+    # child inherits affinity of the thread which spawns it, so it is
+    # pinned before its first instruction runs. Affinity of the calling
+    # thread is restored right after
+    previousCpus = None
+    if useAffinity:
         try:
-            for line in iter(proc.stdout.readline, ''):
-                if '%' in line:
-                    try:
-                        feedback.setProgress(int(progressRegex.search(line).group(0)))
-                    except:
-                        pass
-                else:
-                    feedback.pushConsoleInfo(line)
-                    loglines.append(line)
-        except:
-            pass
+            previousCpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            previousCpus = None
+
+    try:
+        proc = subprocess.Popen(commands,
+                                stdout=subprocess.PIPE,
+                                stdin=subprocess.DEVNULL,
+                                stderr=subprocess.STDOUT,
+                                universal_newlines=True,
+                                **groupArgs)
+    except OSError as e:
+        # without a shell, missing or wrong executable is reported here
+        raise QgsProcessingException('WhiteBox Tools executable not found: {} ({})'.format(commands[0], str(e)))
+    finally:
+        if previousCpus is not None:
+            try:
+                os.sched_setaffinity(0, previousCpus)
+            except OSError:
+                pass
+
+    runLog = whiteboxLogs.RunLog(whiteboxLogs.newLogFile(commandTool(commands)) if verbose else None, fused_command)
+
+    canceled = False
+    with runLog, proc:
+        reader = OutputReader(proc.stdout)
+        reader.start()
+
+        # forward output collected by reader at most UPDATES_PER_SECOND
+        # times per second, whatever the tool prints
+        while True:
+            finished = reader.finished.wait(1.0 / UPDATES_PER_SECOND)
+
+            progress, lines = reader.take()
+            if progress is not None:
+                feedback.setProgress(progress)
+            if lines:
+                feedback.pushConsoleInfo('\n'.join(lines))
+                runLog.write(lines)
+
+            if finished:
+                break
+
+            if feedback.isCanceled():
+                feedback.pushInfo('Canceling WhiteBox Tools process')
+                terminate(proc)
+                canceled = True
+                break
+
+        if profiling and not canceled:
+            usage = whiteboxProfiling.waitProcess(proc)
+
+        reader.join(TERMINATE_TIMEOUT)
+
+    if verbose:
+        QgsMessageLog.logMessage(runLog.text(), 'Processing', QgsMessageLog.INFO)
+
+    if profiling:
+        entry = {'tool': tool,
+                 'version': version(),
+                 'threads': len(cpus),
+                 'status': 'canceled' if canceled else ('finished' if proc.returncode == 0 else 'failed'),
+                 'wallTime': time.monotonic() - startTime,
+                 'inputBytes': inputBytes,
+                 'outputBytes': whiteboxProfiling.filesSize(outputs)}
+        if memoryEstimate is not None:
+            entry['estimatedMemory'], entry['rasterBytes'] = memoryEstimate
+        if usage is not None:
+            entry.update(usage)
+        whiteboxProfiling.record(entry)
+
+    if canceled:
+        raise QgsProcessingException('WhiteBox Tools process was canceled')
+
+    # partial outputs of failed run must not be cached or reported as done
+    if proc.returncode != 0:
+        raise QgsProcessingException('WhiteBox Tools process failed with exit code {}:\n{}'.format(proc.returncode, runLog.text(ERROR_LINES)))
+
+
+def commandTool(commands):
+    for c in commands[1:]:
+        c = str(c)
+        if c.startswith('--run='):
+            return c[len('--run='):]
+    return None
+
+
+def commandFiles(commands):
+    # tool name together with its input and output files, as passed on
+    # the command line
+    tool = None
+    values = []
+    for c in commands[1:]:
+        c = str(c)
+        if c.startswith('--run='):
+            tool = c[len('--run='):]
+        elif c.startswith('--') and '=' in c:
+            values.append(c[2:].split('=', 1))
+
+    description = toolDescription(tool) if tool else None
+    destinations = destinationNames(description) if description is not None else []
+
+    inputs = []
+    outputs = []
+    for name, value in values:
+        if name in destinations:
+            outputs.append(value)
+        else:
+            inputs.extend(v for v in re.split('[,;]', value) if os.path.isfile(v))
+    return tool, inputs, outputs
+
+
+def terminate(proc, timeout=TERMINATE_TIMEOUT):
+    # ask the whole process group to exit and kill it if it does not
+    # finish in time
+    try:
+        if os.name == 'nt':
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        # already finished
+        pass
+
+    try:
+        proc.wait(timeout)
+        return
+    except subprocess.TimeoutExpired:
+        pass
+
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)],
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    proc.kill()
+    proc.wait()
+
+
+def removeOutputs(fileNames):
+    for fileName in fileNames:
+        if not fileName:
+            continue
+
+        root, ext = os.path.splitext(fileName)
+        candidates = [fileName]
+        for sidecar in SIDECAR_EXTENSIONS.get(ext.lower(), []):
+            candidates.append(root + sidecar)
 
-    if ProcessingConfig.getSetting(WHITEBOX_VERBOSE):
-        QgsMessageLog.logMessage('\n'.join(loglines), 'Processing', QgsMessageLog.INFO)
+        for candidate in candidates:
+            try:
+                os.remove(candidate)
+            except OSError:
+                pass